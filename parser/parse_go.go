@@ -0,0 +1,223 @@
+// parse_go extracts exported functions and types from Go source files.
+//
+// Usage:
+//
+//	parse_go FILE   print the result for one file as JSON
+//	parse_go        serve requests: one JSON object per stdin line,
+//	                {"id": 1, "path": "x.go"}, answered by one line on
+//	                stdout, {"id": 1, "result": {...}} or {"id": 1, "error": "..."}
+//
+// Results have the same shape as parser.parse_python_file: functions
+// (name, docstring, parameters, return_type) and classes (structs and
+// interfaces with their exported methods).
+//
+// parser.py builds it on first use into bin/parse_go-<source hash>, with
+//
+//	go build -trimpath -ldflags="-s -w" -o bin/parse_go-<hash> parse_go.go
+package main
+
+import (
+	"bufio"
+	"encoding/json"
+	"fmt"
+	"go/ast"
+	"go/parser"
+	"go/token"
+	"os"
+	"strings"
+)
+
+type Parameter struct {
+	Name string `json:"name"`
+	Type string `json:"type"`
+}
+
+type Function struct {
+	Name       string      `json:"name"`
+	Docstring  string      `json:"docstring"`
+	Parameters []Parameter `json:"parameters"`
+	ReturnType string      `json:"return_type"`
+}
+
+type Class struct {
+	Name      string   `json:"name"`
+	Docstring string   `json:"docstring"`
+	Methods   []string `json:"methods"`
+}
+
+type Result struct {
+	Functions []Function `json:"functions"`
+	Classes   []Class    `json:"classes"`
+	Language  string     `json:"language"`
+}
+
+type Request struct {
+	ID   int64  `json:"id"`
+	Path string `json:"path"`
+}
+
+type Response struct {
+	ID     int64   `json:"id"`
+	Result *Result `json:"result,omitempty"`
+	Error  string  `json:"error,omitempty"`
+}
+
+const noDocstring = "No docstring provided."
+
+func docstring(group *ast.CommentGroup) string {
+	if text := strings.TrimSpace(group.Text()); text != "" {
+		return text
+	}
+	return noDocstring
+}
+
+func typeString(fset *token.FileSet, src []byte, expr ast.Expr) string {
+	start, end := fset.Position(expr.Pos()).Offset, fset.Position(expr.End()).Offset
+	return string(src[start:end])
+}
+
+func receiverName(expr ast.Expr) string {
+	switch t := expr.(type) {
+	case *ast.StarExpr:
+		return receiverName(t.X)
+	case *ast.IndexExpr: // generic receiver, T[K]
+		return receiverName(t.X)
+	case *ast.IndexListExpr:
+		return receiverName(t.X)
+	case *ast.Ident:
+		return t.Name
+	}
+	return ""
+}
+
+func parseFile(path string) (*Result, error) {
+	src, err := os.ReadFile(path)
+	if err != nil {
+		return nil, err
+	}
+	fset := token.NewFileSet()
+	file, err := parser.ParseFile(fset, path, src, parser.ParseComments)
+	if err != nil {
+		return nil, err
+	}
+
+	result := &Result{Functions: []Function{}, Classes: []Class{}, Language: "go"}
+	classIndex := map[string]int{}
+	methods := map[string][]string{}
+	for _, decl := range file.Decls {
+		switch d := decl.(type) {
+		case *ast.GenDecl:
+			if d.Tok != token.TYPE {
+				continue
+			}
+			for _, spec := range d.Specs {
+				typeSpec := spec.(*ast.TypeSpec)
+				if !typeSpec.Name.IsExported() {
+					continue
+				}
+				class := Class{Name: typeSpec.Name.Name, Methods: []string{}}
+				switch t := typeSpec.Type.(type) {
+				case *ast.StructType:
+				case *ast.InterfaceType:
+					// Method specs have names; embedded interfaces and type constraints do not
+					for _, field := range t.Methods.List {
+						for _, name := range field.Names {
+							if name.IsExported() {
+								class.Methods = append(class.Methods, name.Name)
+							}
+						}
+					}
+				default:
+					continue
+				}
+				doc := typeSpec.Doc
+				if doc == nil && len(d.Specs) == 1 {
+					doc = d.Doc
+				}
+				class.Docstring = docstring(doc)
+				classIndex[class.Name] = len(result.Classes)
+				result.Classes = append(result.Classes, class)
+			}
+		case *ast.FuncDecl:
+			if !d.Name.IsExported() {
+				continue
+			}
+			if d.Recv != nil && len(d.Recv.List) > 0 {
+				owner := receiverName(d.Recv.List[0].Type)
+				methods[owner] = append(methods[owner], d.Name.Name)
+				continue
+			}
+			function := Function{
+				Name: d.Name.Name, Docstring: docstring(d.Doc),
+				Parameters: []Parameter{}, ReturnType: "Optional[Any]",
+			}
+			for _, field := range d.Type.Params.List {
+				fieldType := typeString(fset, src, field.Type)
+				if len(field.Names) == 0 {
+					function.Parameters = append(function.Parameters, Parameter{Name: "_", Type: fieldType})
+				}
+				for _, name := range field.Names {
+					function.Parameters = append(function.Parameters, Parameter{Name: name.Name, Type: fieldType})
+				}
+			}
+			if results := d.Type.Results; results != nil && len(results.List) > 0 {
+				start := fset.Position(results.Pos()).Offset
+				end := fset.Position(results.End()).Offset
+				function.ReturnType = string(src[start:end])
+			}
+			result.Functions = append(result.Functions, function)
+		}
+	}
+	// Methods may be declared before their type, so attach them last
+	for owner, names := range methods {
+		if index, ok := classIndex[owner]; ok {
+			result.Classes[index].Methods = append(result.Classes[index].Methods, names...)
+		}
+	}
+	return result, nil
+}
+
+func serve() error {
+	scanner := bufio.NewScanner(os.Stdin)
+	scanner.Buffer(make([]byte, 64*1024), 16*1024*1024)
+	writer := bufio.NewWriter(os.Stdout)
+	encoder := json.NewEncoder(writer)
+	for scanner.Scan() {
+		var request Request
+		response := Response{}
+		if err := json.Unmarshal(scanner.Bytes(), &request); err != nil {
+			response.Error = fmt.Sprintf("bad request: %v", err)
+		} else {
+			response.ID = request.ID
+			result, err := parseFile(request.Path)
+			if err != nil {
+				response.Error = err.Error()
+			} else {
+				response.Result = result
+			}
+		}
+		if err := encoder.Encode(response); err != nil {
+			return err
+		}
+		if err := writer.Flush(); err != nil {
+			return err
+		}
+	}
+	return scanner.Err()
+}
+
+func main() {
+	if len(os.Args) > 1 {
+		result, err := parseFile(os.Args[1])
+		if err != nil {
+			fmt.Fprintln(os.Stderr, err)
+			os.Exit(1)
+		}
+		json.NewEncoder(os.Stdout).Encode(result)
+		return
+	}
+	if err := serve(); err != nil {
+		fmt.Fprintln(os.Stderr, err)
+		os.Exit(1)
+	}
+}
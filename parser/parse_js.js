@@ -0,0 +1,365 @@
+#!/usr/bin/env node
+// parse_js.js extracts public functions and classes from JavaScript files.
+//
+// Usage:
+//   node parse_js.js FILE   print the result for one file as JSON
+//   node parse_js.js        serve requests: one JSON object per stdin line,
+//                           {"id": 1, "path": "x.js"}, answered by one line on
+//                           stdout, {"id": 1, "result": {...}} or {"id": 1, "error": "..."}
+//
+// Results have the same shape as parser.parse_python_file. Top-level function
+// declarations, functions/arrows assigned to const/let/var, and classes with
+// their methods are reported; names starting with "_" or "#" are private.
+// Types come from JSDoc (@param {T} name, @returns {T}) when present.
+//
+// There are no dependencies: a small tokenizer skips comments, strings,
+// template literals and regular expressions, and declarations are matched on
+// the token stream, so the script runs on a bare Node install.
+"use strict";
+
+const fs = require("fs");
+const readline = require("readline");
+
+const NO_DOCSTRING = "No docstring provided.";
+const PUNCT = new Set("{}()[];,<>+-*%&|^!~?:=./@".split(""));
+// After these tokens a "/" starts a regular expression rather than a division
+const REGEX_AFTER_KEYWORDS = new Set([
+  "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await",
+]);
+const MEMBER_MODIFIERS = new Set(["static", "async", "get", "set", "*"]);
+
+function isIdentStart(ch) {
+  return /[A-Za-z_$\u0080-\uffff]/.test(ch);
+}
+
+function isIdentPart(ch) {
+  return /[A-Za-z0-9_$\u0080-\uffff]/.test(ch);
+}
+
+function tokenize(src) {
+  const tokens = [];
+  let pendingDoc = null;
+  let i = 0;
+  // One entry per open template literal, holding its "${" brace depth
+  const templates = [];
+  let braceDepth = 0;
+
+  const push = (type, value) => {
+    tokens.push({ type, value, doc: pendingDoc });
+    pendingDoc = null;
+  };
+  const regexAllowed = () => {
+    const prev = tokens[tokens.length - 1];
+    if (!prev) return true;
+    if (prev.type === "punct") return !")]}".includes(prev.value);
+    return prev.type === "ident" && REGEX_AFTER_KEYWORDS.has(prev.value);
+  };
+  const skipTemplate = () => {
+    // i is just after a "`" or a "}" closing "${"; stop after "`" or "${"
+    while (i < src.length) {
+      const ch = src[i];
+      if (ch === "\\") { i += 2; continue; }
+      if (ch === "`") { i++; return; }
+      if (ch === "$" && src[i + 1] === "{") {
+        i += 2;
+        templates.push(braceDepth);
+        braceDepth++;
+        return;
+      }
+      i++;
+    }
+  };
+
+  while (i < src.length) {
+    const ch = src[i];
+    if (/\s/.test(ch)) { i++; continue; }
+    if (ch === "/" && src[i + 1] === "/") {
+      while (i < src.length && src[i] !== "\n") i++;
+      continue;
+    }
+    if (ch === "/" && src[i + 1] === "*") {
+      const end = src.indexOf("*/", i + 2);
+      const stop = end === -1 ? src.length : end;
+      pendingDoc = src[i + 2] === "*" ? src.slice(i + 3, stop) : pendingDoc;
+      i = stop + 2;
+      continue;
+    }
+    if (ch === "'" || ch === '"') {
+      let j = i + 1;
+      while (j < src.length && src[j] !== ch && src[j] !== "\n") j += src[j] === "\\" ? 2 : 1;
+      push("string", src.slice(i + 1, j));
+      i = j + 1;
+      continue;
+    }
+    if (ch === "`") {
+      i++;
+      push("string", "");
+      skipTemplate();
+      continue;
+    }
+    if (ch === "/" && regexAllowed()) {
+      let j = i + 1;
+      let inClass = false;
+      while (j < src.length && src[j] !== "\n") {
+        if (src[j] === "\\") { j += 2; continue; }
+        if (src[j] === "[") inClass = true;
+        else if (src[j] === "]") inClass = false;
+        else if (src[j] === "/" && !inClass) break;
+        j++;
+      }
+      j++;
+      while (j < src.length && isIdentPart(src[j])) j++;  // flags
+      push("regex", "");
+      i = j;
+      continue;
+    }
+    if (isIdentStart(ch)) {
+      let j = i + 1;
+      while (j < src.length && isIdentPart(src[j])) j++;
+      push("ident", src.slice(i, j));
+      i = j;
+      continue;
+    }
+    if (/[0-9]/.test(ch)) {
+      let j = i + 1;
+      while (j < src.length && /[0-9A-Za-z_.]/.test(src[j])) j++;
+      push("number", src.slice(i, j));
+      i = j;
+      continue;
+    }
+    if (ch === "=" && src[i + 1] === ">") {
+      push("punct", "=>");
+      i += 2;
+      continue;
+    }
+    if (ch === "." && src[i + 1] === "." && src[i + 2] === ".") {
+      push("punct", "...");
+      i += 3;
+      continue;
+    }
+    if (ch === "{") braceDepth++;
+    if (ch === "}") {
+      braceDepth--;
+      if (templates.length && templates[templates.length - 1] === braceDepth) {
+        templates.pop();
+        i++;
+        skipTemplate();
+        continue;
+      }
+    }
+    push(PUNCT.has(ch) ? "punct" : "other", ch);
+    i++;
+  }
+  return tokens;
+}
+
+function parseJsDoc(doc) {
+  const parsed = { description: NO_DOCSTRING, params: {}, returns: null };
+  if (!doc) return parsed;
+  const lines = doc.split("\n").map((line) => line.replace(/^\s*\*?\s?/, "").trimEnd());
+  const description = [];
+  for (const line of lines) {
+    let match;
+    if ((match = line.match(/^@param\s+\{([^}]*)\}\s+\[?([\w$.]+)/))) {
+      parsed.params[match[2]] = match[1];
+    } else if ((match = line.match(/^@returns?\s+\{([^}]*)\}/))) {
+      parsed.returns = match[1];
+    } else if (!line.startsWith("@") && !parsed.sawTag) {
+      description.push(line);
+      continue;
+    }
+    parsed.sawTag = true;
+  }
+  delete parsed.sawTag;
+  const text = description.join("\n").trim();
+  if (text) parsed.description = text;
+  return parsed;
+}
+
+// Index just past the bracket matching the one at tokens[start]
+function skipBalanced(tokens, start) {
+  const open = tokens[start].value;
+  const close = { "(": ")", "[": "]", "{": "}" }[open];
+  let depth = 0;
+  for (let i = start; i < tokens.length; i++) {
+    if (tokens[i].type !== "punct") continue;
+    if (tokens[i].value === open) depth++;
+    else if (tokens[i].value === close && --depth === 0) return i + 1;
+  }
+  return tokens.length;
+}
+
+// Parameter names between tokens[start] ("(") and its matching ")"
+function parameterNames(tokens, start) {
+  const names = [];
+  const end = skipBalanced(tokens, start) - 1;
+  let i = start + 1;
+  while (i < end) {
+    let token = tokens[i];
+    if (token.value === "...") token = tokens[++i];
+    if (token.value === "{" || token.value === "[") {
+      const close = skipBalanced(tokens, i);
+      names.push(token.value === "{" ? "{...}" : "[...]");
+      i = close;
+    } else {
+      names.push(token.value);
+      i++;
+    }
+    // Skip a default value up to the next top-level comma
+    while (i < end && tokens[i].value !== ",") {
+      i = "([{".includes(tokens[i].value) && tokens[i].type === "punct" ? skipBalanced(tokens, i) : i + 1;
+    }
+    i++;
+  }
+  return names;
+}
+
+function makeFunction(name, tokens, parenIndex, doc) {
+  const jsdoc = parseJsDoc(doc);
+  return {
+    name,
+    docstring: jsdoc.description,
+    parameters: parameterNames(tokens, parenIndex).map((param) => ({ name: param, type: jsdoc.params[param] || "Any" })),
+    return_type: jsdoc.returns || "Optional[Any]",
+  };
+}
+
+// Doc comment of the statement ending at tokens[i], looking back over modifiers
+function statementDoc(tokens, i) {
+  let doc = tokens[i].doc;
+  while (i > 0 && ["export", "default", "async"].includes(tokens[i - 1].value)) {
+    i--;
+    doc = tokens[i].doc || doc;
+  }
+  return doc;
+}
+
+const isPublic = (name) => !name.startsWith("_");
+
+function extract(src) {
+  const tokens = tokenize(src);
+  const functions = [];
+  const classes = [];
+  // Open brackets; class bodies carry the class they belong to
+  const stack = [];
+  let pendingClass = null;
+
+  for (let i = 0; i < tokens.length; i++) {
+    const token = tokens[i];
+    const next = tokens[i + 1] || {};
+    const top = stack[stack.length - 1];
+
+    if (token.type === "punct" && "([{".includes(token.value)) {
+      stack.push({ value: token.value, cls: token.value === "{" ? pendingClass : null });
+      if (token.value === "{") pendingClass = null;
+      continue;
+    }
+    if (token.type === "punct" && ")]}".includes(token.value)) {
+      stack.pop();
+      continue;
+    }
+
+    if (token.type === "ident" && token.value === "class" && next.type === "ident") {
+      const prev = tokens[i - 1];
+      if (prev && prev.value === ".") continue;
+      const cls = { name: next.value, docstring: parseJsDoc(statementDoc(tokens, i)).description, methods: [] };
+      if (stack.length === 0 && isPublic(cls.name)) classes.push(cls);
+      pendingClass = cls;
+      i++;
+      continue;
+    }
+
+    if (stack.length === 0 && token.type === "ident") {
+      if (token.value === "function") {
+        let j = i + 1;
+        if (tokens[j] && tokens[j].value === "*") j++;
+        if (tokens[j] && tokens[j].type === "ident" && tokens[j + 1] && tokens[j + 1].value === "(") {
+          if (isPublic(tokens[j].value)) functions.push(makeFunction(tokens[j].value, tokens, j + 1, statementDoc(tokens, i)));
+          i = j;
+        }
+        continue;
+      }
+      if (["const", "let", "var"].includes(token.value) && next.type === "ident" && (tokens[i + 2] || {}).value === "=") {
+        const name = next.value;
+        let j = i + 3;
+        if (tokens[j] && tokens[j].value === "async") j++;
+        if (tokens[j] && tokens[j].value === "function") {
+          j++;
+          if (tokens[j] && tokens[j].value === "*") j++;
+          if (tokens[j] && tokens[j].type === "ident") j++;
+        }
+        if (tokens[j] && tokens[j].value === "(") {
+          const after = tokens[skipBalanced(tokens, j)] || {};
+          const isFunction = tokens[j - 1].value === "function" || tokens[j - 1].type === "ident" || after.value === "=>";
+          if (isFunction && after.value !== "." && isPublic(name)) {
+            functions.push(makeFunction(name, tokens, j, statementDoc(tokens, i)));
+          }
+        } else if (tokens[j] && tokens[j].type === "ident" && (tokens[j + 1] || {}).value === "=>" && isPublic(name)) {
+          const jsdoc = parseJsDoc(statementDoc(tokens, i));
+          functions.push({
+            name,
+            docstring: jsdoc.description,
+            parameters: [{ name: tokens[j].value, type: jsdoc.params[tokens[j].value] || "Any" }],
+            return_type: jsdoc.returns || "Optional[Any]",
+          });
+        }
+      }
+      continue;
+    }
+
+    // Class members: a name directly in the class body followed by "(" or "= (...) =>"
+    if (top && top.cls && (token.type === "ident" || token.type === "string")) {
+      let k = i - 1;
+      while (k >= 0 && MEMBER_MODIFIERS.has(tokens[k].value)) k--;
+      const boundary = k < 0 || ["{", "}", ";"].includes(tokens[k].value);
+      const privateName = tokens[i - 1] && tokens[i - 1].value === "#";
+      if (!boundary || privateName || MEMBER_MODIFIERS.has(token.value) && next.type === "ident") continue;
+      const isMethod = next.value === "(";
+      const isArrowField = next.value === "=" && tokens[i + 2] && (
+        tokens[i + 2].value === "(" && (tokens[skipBalanced(tokens, i + 2)] || {}).value === "=>"
+        || tokens[i + 2].value === "async"
+      );
+      if ((isMethod || isArrowField) && token.value !== "constructor" && isPublic(token.value)) {
+        if (!top.cls.methods.includes(token.value)) top.cls.methods.push(token.value);
+      }
+    }
+  }
+  return { functions, classes, language: "javascript" };
+}
+
+function parseFile(path) {
+  return extract(fs.readFileSync(path, "utf8"));
+}
+
+function serve() {
+  const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+  lines.on("line", (line) => {
+    let response;
+    try {
+      const request = JSON.parse(line);
+      try {
+        response = { id: request.id, result: parseFile(request.path) };
+      } catch (err) {
+        response = { id: request.id, error: String(err && err.message || err) };
+      }
+    } catch (err) {
+      response = { id: 0, error: `bad request: ${err.message}` };
+    }
+    process.stdout.write(JSON.stringify(response) + "\n");
+  });
+}
+
+if (require.main === module) {
+  if (process.argv.length > 2) {
+    try {
+      process.stdout.write(JSON.stringify(parseFile(process.argv[2])) + "\n");
+    } catch (err) {
+      process.stderr.write(`${err.message}\n`);
+      process.exitCode = 1;
+    }
+  } else {
+    serve();
+  }
+}
+
+module.exports = { extract };
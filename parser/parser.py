@@ -1,8 +1,17 @@
 import os
 import ast
 import sys
+import time
+import queue
+import atexit
+import shutil
+import threading
 import subprocess
 import json
+import hashlib
+import sqlite3
+import contextlib
+import concurrent.futures
 from pathlib import Path
 
 # Ensure correct imports from updated generator
@@ -91,44 +100,390 @@ def parse_python_file(file_path):
         print(f"❌ Failed to parse {file_path}: {e}")
         return {"functions": [], "classes": []}
 
+PARSER_DIR = Path(__file__).resolve().parent
+JS_PARSER = PARSER_DIR / "parse_js.js"
+GO_PARSER_SOURCE = PARSER_DIR / "parse_go.go"
+GO_PARSER_BIN_DIR = PARSER_DIR / "bin"  # Go parser builds, one per source version (git-ignored)
+JS_WORKERS = min(4, os.cpu_count() or 1)  # node processes parsing JavaScript at once
+PARSE_TIMEOUT = 30  # seconds one file may take before its worker is killed and restarted
+WORKER_MAX_REQUESTS = 10_000  # files one worker process parses before it is recycled
+
+class ParserWorkerError(Exception):
+    """A parser worker rejected a file, crashed or timed out."""
+
+class ParserWorker:
+    """One long-lived parser process speaking line-delimited JSON.
+
+    Each request is a line ``{"id": n, "path": ...}`` on the worker's stdin,
+    answered by ``{"id": n, "result": {...}}`` or ``{"id": n, "error": ...}``
+    on its stdout. The process is started on first use and restarted after
+    it crashes, after a file exceeds ``timeout`` seconds, and after
+    ``max_requests`` files. If ``command`` cannot be executed (missing,
+    not executable, wrong platform) each of ``fallbacks`` is tried in turn
+    and the first that starts is kept. Not thread-safe; ParserWorkerPool
+    hands out one worker per thread.
+    """
+
+    def __init__(self, command, timeout=PARSE_TIMEOUT, max_requests=WORKER_MAX_REQUESTS, fallbacks=()):
+        self.command = command
+        self.fallbacks = list(fallbacks)
+        self.timeout = timeout
+        self.max_requests = max_requests
+        self.process = None
+        self.requests = 0
+        self.restarts = 0
+        self._responses = None
+        self._next_id = 0
+
+    def _start(self):
+        while True:
+            try:
+                self.process = subprocess.Popen(
+                    self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, encoding="utf-8", bufsize=1
+                )
+                break
+            except OSError as e:
+                if not self.fallbacks:
+                    raise ParserWorkerError(f"cannot start {self.command[0]}: {e}") from e
+                self.command = self.fallbacks.pop(0)
+        self.requests = 0
+        self._responses = queue.Queue()
+        # A reader thread lets parse() wait on stdout with a timeout
+        threading.Thread(target=self._read, args=(self.process, self._responses), daemon=True).start()
+
+    @staticmethod
+    def _read(process, responses):
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)  # EOF: the process exited
+
+    def stop(self):
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        self.process = None
+
+    def _fail(self, message):
+        self.stop()
+        self.restarts += 1
+        raise ParserWorkerError(message)
+
+    def parse(self, file_path):
+        if self.process is not None and (self.process.poll() is not None or self.requests >= self.max_requests):
+            self.stop()
+        if self.process is None:
+            self._start()
+
+        self._next_id += 1
+        request_id = self._next_id
+        try:
+            self.process.stdin.write(json.dumps({"id": request_id, "path": str(file_path)}) + "\n")
+            self.process.stdin.flush()
+        except OSError:
+            self._fail("worker exited")
+        self.requests += 1
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                line = self._responses.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                self._fail(f"timed out after {self.timeout}s")
+            if line is None:
+                self._fail("worker crashed")
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                response = None
+            if not isinstance(response, dict):
+                # Stray output means the stream can no longer be trusted
+                self._fail(f"worker wrote an invalid response line: {line[:200]!r}")
+            if response.get("id") != request_id:
+                continue  # answer to a bad request line, not ours
+            if "error" in response:
+                raise ParserWorkerError(response["error"])
+            return response["result"]
+
+class ParserWorkerPool:
+    """A fixed set of ParserWorkers shared by threads; processes start on demand."""
+
+    def __init__(self, command, size=1, **worker_options):
+        self.workers = [ParserWorker(command, **worker_options) for _ in range(size)]
+        self._idle = queue.LifoQueue()
+        for worker in self.workers:
+            self._idle.put(worker)
+
+    def parse(self, file_path):
+        worker = self._idle.get()
+        try:
+            return worker.parse(file_path)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+
+def _build_go_parser():
+    """Build parse_go.go once per source version; the binary path, or None."""
+    digest = hashlib.sha256(GO_PARSER_SOURCE.read_bytes()).hexdigest()[:12]
+    binary = GO_PARSER_BIN_DIR / f"parse_go-{digest}{'.exe' if os.name == 'nt' else ''}"
+    if binary.exists():
+        return binary
+    if not shutil.which("go"):
+        return None
+    GO_PARSER_BIN_DIR.mkdir(exist_ok=True)
+    # Built under a temporary name so a concurrent run never executes a partial file
+    partial = binary.with_name(f"{binary.name}.{os.getpid()}.tmp")
+    built = subprocess.run(
+        ["go", "build", "-trimpath", "-ldflags=-s -w", "-o", str(partial), str(GO_PARSER_SOURCE)],
+        capture_output=True, text=True
+    )
+    if built.returncode != 0:
+        print(f"⚠️ Failed to build the Go parser: {built.stderr.strip()}")
+        partial.unlink(missing_ok=True)
+        return None
+    os.replace(partial, binary)
+    return binary
+
+def _go_parser_commands():
+    """Commands to try for the Go parser: a local build, then ``go run``."""
+    fallback = ["go", "run", str(GO_PARSER_SOURCE)]
+    binary = _build_go_parser()
+    return ([str(binary)], [fallback]) if binary else (fallback, [])
+
+_worker_pools = {}
+_worker_pools_lock = threading.Lock()
+
+def get_worker_pool(language):
+    """The process-wide worker pool for "javascript" or "go"."""
+    with _worker_pools_lock:
+        if language not in _worker_pools:
+            if language == "javascript":
+                _worker_pools[language] = ParserWorkerPool(["node", str(JS_PARSER)], size=JS_WORKERS)
+            else:
+                command, fallbacks = _go_parser_commands()
+                _worker_pools[language] = ParserWorkerPool(command, fallbacks=fallbacks)
+        return _worker_pools[language]
+
+@atexit.register
+def close_worker_pools():
+    with _worker_pools_lock:
+        for pool in _worker_pools.values():
+            pool.close()
+        _worker_pools.clear()
+
 def parse_javascript_file(file_path):
     try:
-        result = subprocess.run(["node", "parse_js.js", file_path], capture_output=True, text=True)
-        return json.loads(result.stdout) if result.stdout else {"functions": [], "classes": []}
+        return get_worker_pool("javascript").parse(file_path)
     except Exception as e:
         print(f"❌ Error parsing JavaScript file {file_path}: {e}")
-        return {"functions": [], "classes": [], "language": "javascript"}
+        return {"functions": [], "classes": [], "language": "javascript", "error": str(e)}
 
 def parse_go_file(file_path):
     try:
-        result = subprocess.run(["go", "run", "parse_go.go", file_path], capture_output=True, text=True)
-        return json.loads(result.stdout) if result.stdout else {"functions": [], "classes": []}
+        return get_worker_pool("go").parse(file_path)
     except Exception as e:
         print(f"❌ Error parsing Go file {file_path}: {e}")
-        return {"functions": [], "classes": [], "language": "go"}
+        return {"functions": [], "classes": [], "language": "go", "error": str(e)}
+
+PARSERS = {
+    ".py": parse_python_file,
+    ".js": parse_javascript_file,
+    ".go": parse_go_file,
+}
+
+# Bump when any parser's output changes; cached results from other versions are dropped
+PARSER_VERSION = 2
+DEFAULT_CACHE_PATH = project_root / ".parse_cache.db"
+
+class ParseCache:
+    """Parse results on disk, keyed by file content hash, suffix and PARSER_VERSION.
+
+    Unchanged files are served from here instead of being parsed again.
+    ``hits`` and ``misses`` count lookups since the cache was opened.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                digest TEXT NOT NULL,
+                suffix TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (digest, suffix, version)
+            ) WITHOUT ROWID
+        """)
+        with self.conn:
+            self.conn.execute("DELETE FROM parse_cache WHERE version != ?", (PARSER_VERSION,))
+
+    @staticmethod
+    def digest(file_path):
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def get_many(self, keys):
+        """Cached results for (digest, suffix) keys; missing keys are left out."""
+        found = {}
+        keys = list(set(keys))
+        for i in range(0, len(keys), 400):  # stay under SQLite's bound-parameter limit
+            batch = keys[i:i + 400]
+            rows = self.conn.execute(
+                "SELECT digest, suffix, result FROM parse_cache WHERE version = ? AND ("
+                + " OR ".join(["(digest = ? AND suffix = ?)"] * len(batch)) + ")",
+                [PARSER_VERSION] + [value for key in batch for value in key]
+            )
+            for digest, suffix, result in rows:
+                found[(digest, suffix)] = json.loads(result)
+        return found
+
+    def put_many(self, items):
+        """Store (digest, suffix, result) triples in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO parse_cache (digest, suffix, version, result) VALUES (?, ?, ?, ?)",
+                [(digest, suffix, PARSER_VERSION, json.dumps(result)) for digest, suffix, result in items]
+            )
+
+    def close(self):
+        self.conn.close()
+
+def _parse_file(file_path):
+    """Parse one file with the parser for its suffix; None if it failed."""
+    try:
+        return PARSERS[file_path.suffix](file_path)
+    except Exception as file_err:
+        print(f"❌ Error processing {file_path}: {file_err}")
+        return None
+
+def _parse_chunk(file_paths):
+    """Worker entry point: parse a chunk of files, results in input order."""
+    return [_parse_file(file_path) for file_path in file_paths]
+
+def _parse_chunks(chunks, workers):
+    """Yield (chunk, results) pairs as chunks finish.
 
-def parse_directory(directory_path):
+    Python chunks go to a pool of ``workers`` processes. JavaScript and Go
+    chunks are already parsed by worker processes, so threads in this
+    process feed them to the shared worker pools.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield chunk, _parse_chunk(chunk)
+        return
+    python_chunks = [chunk for chunk in chunks if chunk[0].suffix == ".py"]
+    external_chunks = [chunk for chunk in chunks if chunk[0].suffix != ".py"]
+    with contextlib.ExitStack() as stack:
+        futures = {}
+        if python_chunks:
+            # Submitted first so the pool forks before any feeder threads start
+            processes = stack.enter_context(concurrent.futures.ProcessPoolExecutor(max_workers=workers))
+            futures.update((processes.submit(_parse_chunk, chunk), chunk) for chunk in python_chunks)
+        if external_chunks:
+            threads = stack.enter_context(concurrent.futures.ThreadPoolExecutor(max_workers=JS_WORKERS + 1))
+            futures.update((threads.submit(_parse_chunk, chunk), chunk) for chunk in external_chunks)
+        for future in concurrent.futures.as_completed(futures):
+            yield futures[future], future.result()
+
+def _print_progress(done, total):
+    print(f"\r📂 Parsed {done}/{total} files", end="\n" if done == total else "", flush=True)
+
+def parse_directory(directory_path, workers=None, chunk_size=None, cache=True):
+    """Parse every .py/.js/.go file under directory_path.
+
+    Files are split into chunks and parsed by a pool of ``workers`` processes
+    (default: one per core; ``workers=1`` parses in this process). Results
+    are merged in sorted path order, so the output does not depend on which
+    worker finishes first. Results are keyed by file name; when two files
+    share a name the later path wins.
+
+    ``cache`` is True for the default ParseCache, a ParseCache or a path to
+    use instead, or False to parse everything. Files whose content was
+    parsed before are served from the cache; hit/miss counts are printed.
+    """
     directory_path = Path(directory_path)
     if not directory_path.exists():
         print(f"❌ Error: Directory '{directory_path}' does not exist.")
         return {}
 
-    results = {}
+    file_paths = sorted(
+        file_path for file_path in directory_path.rglob("*")
+        if file_path.suffix in PARSERS and file_path.is_file()
+    )
+    if not file_paths:
+        return {}
 
-    for file_path in directory_path.rglob("*"):
-        try:
-            if file_path.suffix == ".py":
-                print(f"📂 Parsing Python file: {file_path}...")
-                results[file_path.name] = parse_python_file(file_path)
-            elif file_path.suffix == ".js":
-                print(f"📂 Parsing JavaScript file: {file_path}...")
-                results[file_path.name] = parse_javascript_file(file_path)
-            elif file_path.suffix == ".go":
-                print(f"📂 Parsing Go file: {file_path}...")
-                results[file_path.name] = parse_go_file(file_path)
-        except Exception as file_err:
-            print(f"❌ Error processing {file_path}: {file_err}")
-    
+    parse_cache = None
+    if isinstance(cache, ParseCache):
+        parse_cache = cache
+    elif cache:
+        parse_cache = ParseCache() if cache is True else ParseCache(cache)
+
+    parsed = {}
+    keys = {}
+    if parse_cache is not None:
+        for file_path in file_paths:
+            try:
+                keys[file_path] = (ParseCache.digest(file_path), file_path.suffix)
+            except OSError:
+                pass  # parsed (and reported) below, never cached
+        cached = parse_cache.get_many(keys.values())
+        for file_path, key in keys.items():
+            if key in cached:
+                parsed[file_path] = cached[key]
+        parse_cache.hits += len(parsed)
+        parse_cache.misses += len(file_paths) - len(parsed)
+    pending = [file_path for file_path in file_paths if file_path not in parsed]
+
+    total = len(pending)
+    if total:
+        workers = min(workers or os.cpu_count() or 1, total)
+        if chunk_size is None:
+            # About 8 chunks per worker keeps them all busy when some files are slow
+            chunk_size = max(1, min(256, total // (workers * 8)))
+        # Chunks hold only Python or only JavaScript/Go files; see _parse_chunks
+        chunks = []
+        for group in (
+            [file_path for file_path in pending if file_path.suffix == ".py"],
+            [file_path for file_path in pending if file_path.suffix != ".py"],
+        ):
+            chunks.extend(group[i:i + chunk_size] for i in range(0, len(group), chunk_size))
+
+        done = 0
+        fresh = []
+        for chunk, chunk_results in _parse_chunks(chunks, workers):
+            for file_path, result in zip(chunk, chunk_results):
+                if result is not None:
+                    parsed[file_path] = result
+                    if file_path in keys and "error" not in result:
+                        fresh.append((*keys[file_path], result))
+            done += len(chunk)
+            _print_progress(done, total)
+        if parse_cache is not None:
+            parse_cache.put_many(fresh)
+
+    if parse_cache is not None:
+        print(f"🗄️ Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses")
+        if parse_cache is not cache:
+            parse_cache.close()
+
+    results = {}
+    for file_path in file_paths:
+        if file_path in parsed:
+            results[file_path.name] = parsed[file_path]
     return results
 
 def get_latest_scraped_repo(base_dir):
@@ -7,7 +7,7 @@ project_root = Path(__file__).resolve().parent
 sys.path.append(str(project_root))
 
 from models.pydantic_generator import generate_pydantic_models, save_pydantic_models
-from parser import parse_directory, get_latest_scraped_repo
+from parser.parser import parse_directory, get_latest_scraped_repo
 
 def regenerate_all():
     print("🚀 Starting complete regeneration process...")
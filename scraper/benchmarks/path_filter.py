@@ -0,0 +1,57 @@
+"""Micro-benchmark: per-entry cost of tree filtering on a synthetic tree.
+
+Compares the previous per-pattern ``re.search`` loop with PathFilter:
+
+    python -m scraper.benchmarks.path_filter --entries 200000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from scraper.github_scraper.filters import SKIP_PATTERNS, PathFilter
+
+DIRS = ["src", "lib", "pkg", "core", "api", "utils", "tests", "docs", "node_modules", "build", "vendor", "internal"]
+FILES = ["main", "models", "views", "helpers", "__init__", "config", "index", "schema", "README", "setup"]
+EXTENSIONS = [".py", ".js", ".go", ".md", ".json", ".txt", ".ts", ".yml"]
+
+def synthetic_tree(entries: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        "/".join(rng.choice(DIRS) for _ in range(rng.randint(0, 6)))
+        + f"/{rng.choice(FILES)}{i % 97}{rng.choice(EXTENSIONS)}"
+        for i in range(entries)
+    ]
+
+def legacy_filter(path, file_extensions):
+    return (any(path.endswith(ext) for ext in file_extensions) and
+            not any(re.search(pattern, path) for pattern in SKIP_PATTERNS))
+
+def measure(name, predicate, paths):
+    started = time.perf_counter()
+    kept = sum(1 for path in paths if predicate(path))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed * 1e9 / len(paths):8.0f} ns/entry  {elapsed * 1000:8.1f} ms total  ({kept} kept)")
+    return elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--extensions", nargs="+", default=[".py", ".js", ".go"])
+    args = parser.parse_args(argv)
+
+    paths = synthetic_tree(args.entries)
+    print(f"{len(paths)} synthetic tree entries, extensions {args.extensions}")
+    legacy = measure("re.search per pattern", lambda p: legacy_filter(p, args.extensions), paths)
+    compiled = measure("PathFilter", PathFilter(args.extensions), paths)
+    measure("PathFilter + globs", PathFilter(
+        args.extensions, include=["src/", "lib/**/*.py", "*.go"], exclude=["**/vendor/", "!**/vendor/keep.py"]
+    ), paths)
+    print(f"speedup: {legacy / compiled:.1f}x")
+
+if __name__ == "__main__":
+    main()
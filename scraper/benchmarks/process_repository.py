@@ -0,0 +1,80 @@
+"""Benchmark process_repository against synthetic repos on a fake GitHub.
+
+Everything runs offline against scraper.fake_github, in a temp directory:
+
+    python -m scraper.benchmarks.process_repository --sizes 100 10000 100000
+
+For each repository size it reports:
+- repositories per minute;
+- HTTP requests per downloaded file;
+- p95 per-file download latency (worst repository).
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from scraper import github_scraper as gs
+from scraper.fake_github import FakeGitHub, synthetic_repo
+
+async def run_size(files: int, repos: int, latency: float, fetch_mode: str, workdir: Path) -> dict:
+    gs.settings.db_file = str(workdir / "bench.db")
+    gs.settings.repos_dir = workdir / "repos"
+    gs.settings.blob_store_dir = workdir / "blobs"
+    gs.settings.http_cache_dir = workdir / "http_cache"
+    gs.settings.tokens = ["benchmark"]  # only the fake server is contacted
+    gs.init_db()
+
+    fake = FakeGitHub(
+        [synthetic_repo("bench", f"repo{files}-{i}", files, seed=i) for i in range(repos)],
+        latency=latency,
+        rate_limit=10 ** 9
+    )
+    results = []
+    async with gs.ScraperSession(transport=fake.transport()) as session:
+        started = time.perf_counter()
+        for i in range(repos):
+            results.append(await gs.process_repository(
+                "bench", f"repo{files}-{i}", session=session, fetch_mode=fetch_mode
+            ))
+        elapsed = time.perf_counter() - started
+
+    downloaded = sum(result.get("downloaded_files", 0) for result in results)
+    p95s = [result["downloads"].get("latency_p95", 0.0) for result in results if "downloads" in result]
+    return {
+        "files": files,
+        "repos": repos,
+        "failed": sum(result.get("status") != "success" for result in results),
+        "seconds": elapsed,
+        "repos_per_min": repos / elapsed * 60,
+        "requests_per_file": sum(result.get("http_requests", 0) for result in results) / max(downloaded, 1),
+        "p95_latency_ms": max(p95s, default=0.0) * 1000
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000], help="Files per repository")
+    parser.add_argument("--repos", type=int, default=3, help="Repositories scraped per size")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every fake response")
+    parser.add_argument("--fetch-mode", choices=["auto", "files", "archive"], default="files")
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger(gs.__name__).setLevel(logging.WARNING)
+
+    print(f"{'files':>8} {'repos':>5} {'repos/min':>10} {'req/file':>9} {'p95 ms':>8} {'seconds':>8}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            row = asyncio.run(run_size(size, args.repos, args.latency, args.fetch_mode, Path(workdir)))
+        print(
+            f"{row['files']:>8} {row['repos']:>5} {row['repos_per_min']:>10.1f} "
+            f"{row['requests_per_file']:>9.3f} {row['p95_latency_ms']:>8.2f} {row['seconds']:>8.1f}"
+            + (f"  ({row['failed']} failed)" if row["failed"] else "")
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""Local stand-in for the GitHub API, for offline tests and benchmarks.
+
+FakeGitHub serves the endpoints the scraper uses from in-memory synthetic
+repositories:
+- search, user repositories and repository metadata;
+- git trees, both recursive and per-subtree;
+- contents, raw or base64;
+- tarballs;
+- GraphQL repository lookups;
+- rate_limit.
+
+Responses carry ETags and realistic ``X-RateLimit-*`` headers. Plug it
+into a ScraperSession with ``transport()``, which makes no network calls,
+or serve it over HTTP with ``serve()`` and point ``GITHUB_API_URL`` at it.
+"""
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import random
+import re
+import tarfile
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+def git_blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+@dataclass
+class FakeRepo:
+    owner: str
+    name: str
+    files: Dict[str, bytes]
+    stars: int = 0
+    forks: int = 0
+    language: str = "Python"
+    description: str = ""
+    default_branch: str = "main"
+    # Built by FakeGitHub.add_repo: tree SHA -> listing, plus the root SHA
+    trees: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict, repr=False)
+    root_sha: str = ""
+    _tarball: Optional[bytes] = field(default=None, repr=False)
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.name}"
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "full_name": self.full_name,
+            "name": self.name,
+            "owner": {"login": self.owner},
+            "description": self.description,
+            "fork": False,
+            "language": self.language,
+            "stargazers_count": self.stars,
+            "forks_count": self.forks,
+            "default_branch": self.default_branch,
+            "size": sum(len(data) for data in self.files.values()) // 1024,
+            "pushed_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-01T00:00:00Z"
+        }
+
+def synthetic_source(index: int, salt: str = "") -> bytes:
+    """A small Python module with two functions, unique per (index, salt)"""
+    return (
+        f'"""Synthetic module {index} {salt}"""\n\n'
+        f"def compute_{index}(a: int, b: int) -> int:\n"
+        f'    """Combine a and b for case {index}."""\n'
+        f"    return a * {index % 7 + 1} + b\n\n"
+        f"def _helper_{index}(items):\n"
+        f"    return [item for item in items if item != {index}]\n"
+    ).encode()
+
+def synthetic_repo(owner: str, name: str, files: int, seed: int = 0, **kwargs) -> FakeRepo:
+    """A repository with ``files`` Python modules spread over nested packages"""
+    rng = random.Random(seed)
+    contents = {
+        f"pkg{i % 100}/sub{(i // 100) % 100}/mod_{i}.py": synthetic_source(i, f"{owner}/{name}")
+        for i in range(files)
+    }
+    contents["README.md"] = f"# {name}\n".encode()
+    contents["docs/index.md"] = b"Documentation\n"
+    kwargs.setdefault("stars", rng.randint(0, 5000))
+    return FakeRepo(owner, name, contents, **kwargs)
+
+class FakeGitHub:
+    """In-memory GitHub API.
+
+    ``latency`` seconds are added to every response. Each token gets
+    ``rate_limit`` requests per resource per hour, after which requests get
+    403 with ``X-RateLimit-Remaining: 0``. Recursive tree listings longer
+    than ``truncate_at`` entries are cut off and marked ``truncated``, as
+    GitHub does.
+    """
+
+    def __init__(
+        self,
+        repos: List[FakeRepo] = (),
+        latency: float = 0.0,
+        rate_limit: int = 5000,
+        truncate_at: int = 100_000
+    ):
+        self.repos: Dict[str, FakeRepo] = {}
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.truncate_at = truncate_at
+        self.reset_at = int(time.time()) + 3600
+        self.used: Dict[Tuple[str, str], int] = {}
+        self.request_log: List[str] = []
+        self._lock = threading.Lock()
+        for repo in repos:
+            self.add_repo(repo)
+
+    def add_repo(self, repo: FakeRepo) -> FakeRepo:
+        """Register a repository and build its git trees"""
+        directories: Dict[str, Dict[str, Tuple[str, str, int]]] = {"": {}}
+        for path in sorted(repo.files):
+            parts = path.split("/")
+            for depth in range(1, len(parts)):
+                directories.setdefault("/".join(parts[:depth]), {})
+            parent = "/".join(parts[:-1])
+            data = repo.files[path]
+            directories[parent][parts[-1]] = ("blob", git_blob_sha(data), len(data))
+
+        # Hash directories bottom-up so each tree SHA covers its children
+        dir_shas: Dict[str, str] = {}
+        for directory in directories:
+            if directory:
+                parent, _, name = directory.rpartition("/")
+                directories[parent][name] = ("tree", "", 0)
+        for directory in sorted(directories, key=lambda d: d.count("/") if d else -1, reverse=True):
+            children = directories[directory]
+            listing = []
+            for name in sorted(children):
+                kind, sha, size = children[name]
+                child_path = f"{directory}/{name}" if directory else name
+                if kind == "tree":
+                    sha = dir_shas[child_path]
+                    listing.append({"path": name, "mode": "040000", "type": "tree", "sha": sha})
+                else:
+                    listing.append({"path": name, "mode": "100644", "type": "blob", "sha": sha, "size": size})
+            tree_sha = hashlib.sha1(json.dumps(listing, sort_keys=True).encode()).hexdigest()
+            dir_shas[directory] = tree_sha
+            repo.trees[tree_sha] = listing
+        repo.root_sha = dir_shas[""]
+        repo._tarball = None
+        self.repos[repo.full_name] = repo
+        return repo
+
+    # -- transports ----------------------------------------------------------
+
+    def transport(self) -> httpx.MockTransport:
+        """In-process transport for ScraperSession(transport=...)"""
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self.handle(request)
+        return httpx.MockTransport(handler)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """Serve over HTTP from a daemon thread; ``server.server_address`` has the port"""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def _dispatch(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = httpx.Request(
+                    self.command,
+                    f"http://{self.headers.get('Host', host)}{self.path}",
+                    headers=dict(self.headers.items()),
+                    content=self.rfile.read(length) if length else b""
+                )
+                if fake.latency:
+                    time.sleep(fake.latency)
+                response = fake.handle(request)
+                body = response.content
+                self.send_response(response.status_code)
+                for key, value in response.headers.items():
+                    if key.lower() not in ("content-length", "transfer-encoding"):
+                        self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    # -- routing -------------------------------------------------------------
+
+    ROUTES = [
+        (re.compile(r"^/rate_limit$"), "_rate_limit"),
+        (re.compile(r"^/graphql$"), "_graphql"),
+        (re.compile(r"^/search/repositories$"), "_search"),
+        (re.compile(r"^/users/(?P<owner>[^/]+)/repos$"), "_user_repos"),
+        (re.compile(r"^/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)$"), "_repository"),
+        (re.compile(r"^/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)/git/trees/(?P<ref>[^/]+)$"), "_tree"),
+        (re.compile(r"^/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)/contents/(?P<path>.+)$"), "_contents"),
+        (re.compile(r"^/repos/(?P<owner>[^/]+)/(?P<name>[^/]+)/tarball/(?P<ref>[^/]+)$"), "_tarball"),
+    ]
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        with self._lock:
+            self.request_log.append(path)
+        resource = "search" if path.startswith("/search/") else "graphql" if path == "/graphql" else "core"
+        limited = path != "/rate_limit"
+        token = request.headers.get("Authorization", "anonymous")
+        if limited:
+            with self._lock:
+                used = self.used.get((token, resource), 0)
+                if used >= self.rate_limit:
+                    return self._with_rate_headers(
+                        httpx.Response(403, json={"message": "API rate limit exceeded"}), resource, used
+                    )
+                self.used[(token, resource)] = used = used + 1
+        for pattern, method_name in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                response = getattr(self, method_name)(request, **match.groupdict())
+                break
+        else:
+            response = httpx.Response(404, json={"message": "Not Found"})
+        if limited:
+            response = self._with_rate_headers(response, resource, used)
+        return response
+
+    def _with_rate_headers(self, response: httpx.Response, resource: str, used: int) -> httpx.Response:
+        response.headers.update({
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(0, self.rate_limit - used)),
+            "X-RateLimit-Reset": str(self.reset_at),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Resource": resource
+        })
+        return response
+
+    @staticmethod
+    def _etagged(request: httpx.Request, etag: str, **kwargs) -> httpx.Response:
+        etag = f'"{etag}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        response = httpx.Response(200, **kwargs)
+        response.headers["ETag"] = etag
+        return response
+
+    def _repo(self, owner: str, name: str) -> Optional[FakeRepo]:
+        return self.repos.get(f"{owner}/{name}")
+
+    @staticmethod
+    def _page(request: httpx.Request, items: List[Any]) -> List[Any]:
+        per_page = min(int(request.url.params.get("per_page", 30)), 100)
+        page = int(request.url.params.get("page", 1))
+        return items[(page - 1) * per_page:page * per_page]
+
+    def _rate_limit(self, request: httpx.Request) -> httpx.Response:
+        token = request.headers.get("Authorization", "anonymous")
+        resources = {
+            resource: {
+                "limit": self.rate_limit,
+                "remaining": max(0, self.rate_limit - self.used.get((token, resource), 0)),
+                "reset": self.reset_at
+            }
+            for resource in ("core", "search", "graphql")
+        }
+        return httpx.Response(200, json={"resources": resources, "rate": resources["core"]})
+
+    def _search(self, request: httpx.Request) -> httpx.Response:
+        terms, language, min_stars = [], None, 0
+        for token in request.url.params.get("q", "").split():
+            if token.startswith("language:"):
+                language = token.partition(":")[2].lower()
+            elif token.startswith("stars:>="):
+                min_stars = int(token[len("stars:>="):])
+            else:
+                terms.append(token.lower())
+        matches = [
+            repo.metadata() for repo in self.repos.values()
+            if (not terms or any(term in repo.full_name.lower() or term in repo.description.lower() for term in terms))
+            and (language is None or repo.language.lower() == language)
+            and repo.stars >= min_stars
+        ]
+        matches.sort(key=lambda item: -item["stargazers_count"])
+        return httpx.Response(200, json={
+            "total_count": len(matches), "incomplete_results": False, "items": self._page(request, matches)
+        })
+
+    def _user_repos(self, request: httpx.Request, owner: str) -> httpx.Response:
+        repos = [repo.metadata() for repo in self.repos.values() if repo.owner == owner]
+        return httpx.Response(200, json=self._page(request, repos))
+
+    def _repository(self, request: httpx.Request, owner: str, name: str) -> httpx.Response:
+        repo = self._repo(owner, name)
+        if repo is None:
+            return httpx.Response(404, json={"message": "Not Found"})
+        return self._etagged(request, repo.root_sha, json=repo.metadata())
+
+    def _tree(self, request: httpx.Request, owner: str, name: str, ref: str) -> httpx.Response:
+        repo = self._repo(owner, name)
+        if repo is None:
+            return httpx.Response(404, json={"message": "Not Found"})
+        sha = repo.root_sha if ref == repo.default_branch else ref
+        if sha not in repo.trees:
+            return httpx.Response(404, json={"message": "Not Found"})
+        truncated = False
+        if request.url.params.get("recursive") in ("1", "true"):
+            entries = self._flatten(repo, sha)
+            truncated = len(entries) > self.truncate_at
+            entries = entries[:self.truncate_at]
+        else:
+            entries = repo.trees[sha]
+        return self._etagged(
+            request, f"{sha}-{int(truncated)}",
+            json={"sha": sha, "tree": entries, "truncated": truncated}
+        )
+
+    def _flatten(self, repo: FakeRepo, sha: str, prefix: str = "") -> List[Dict[str, Any]]:
+        entries = []
+        for item in repo.trees[sha]:
+            path = f"{prefix}{item['path']}"
+            entries.append({**item, "path": path})
+            if item["type"] == "tree":
+                entries.extend(self._flatten(repo, item["sha"], f"{path}/"))
+        return entries
+
+    def _contents(self, request: httpx.Request, owner: str, name: str, path: str) -> httpx.Response:
+        repo = self._repo(owner, name)
+        data = repo.files.get(path) if repo else None
+        if data is None:
+            return httpx.Response(404, json={"message": "Not Found"})
+        sha = git_blob_sha(data)
+        if "raw" in request.headers.get("Accept", ""):
+            return self._etagged(request, sha, content=data)
+        return self._etagged(request, sha, json={
+            "path": path, "sha": sha, "size": len(data), "encoding": "base64",
+            "content": base64.b64encode(data).decode(),
+            "download_url": f"https://raw.githubusercontent.com/{owner}/{name}/{repo.default_branch}/{path}"
+        })
+
+    def _tarball(self, request: httpx.Request, owner: str, name: str, ref: str) -> httpx.Response:
+        repo = self._repo(owner, name)
+        if repo is None:
+            return httpx.Response(404, json={"message": "Not Found"})
+        if repo._tarball is None:
+            buffer = io.BytesIO()
+            prefix = f"{owner}-{name}-{repo.root_sha[:7]}"
+            with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+                for path, data in sorted(repo.files.items()):
+                    info = tarfile.TarInfo(f"{prefix}/{path}")
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+            repo._tarball = buffer.getvalue()
+        return httpx.Response(200, content=repo._tarball, headers={"Content-Type": "application/x-gzip"})
+
+    def _graphql(self, request: httpx.Request) -> httpx.Response:
+        variables = json.loads(request.content or b"{}").get("variables", {})
+        data = {}
+        for key, owner in variables.items():
+            if not key.startswith("o"):
+                continue
+            index = key[1:]
+            repo = self._repo(owner, variables.get(f"n{index}", ""))
+            data[f"r{index}"] = None if repo is None else {
+                "nameWithOwner": repo.full_name,
+                "name": repo.name,
+                "owner": {"login": repo.owner},
+                "description": repo.description,
+                "isFork": False,
+                "stargazerCount": repo.stars,
+                "forkCount": repo.forks,
+                "pushedAt": "2024-01-01T00:00:00Z",
+                "updatedAt": "2024-01-01T00:00:00Z",
+                "diskUsage": repo.metadata()["size"],
+                "primaryLanguage": {"name": repo.language},
+                "defaultBranchRef": {"name": repo.default_branch}
+            }
+        return httpx.Response(200, json={"data": data})
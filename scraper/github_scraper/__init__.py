@@ -0,0 +1,55 @@
+"""GitHub scraper package.
+
+Submodules are imported on first use of one of their names, so importing
+the package (or ``scraper.github_scraper.analysis``) costs no more than the
+standard library modules they need. In particular nothing reads the
+environment, opens a log file or imports httpx/psutil until the HTTP side
+is actually used.
+"""
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "config": [
+        "PACKAGE_DIR", "SKIP_PATTERNS", "ScraperConfig", "Settings", "settings", "configure_logging"
+    ],
+    "analysis": ["parse_python_function", "analyze_python_file", "analyze_python_path"],
+    "filters": ["PathFilter", "should_skip_path", "is_wanted_file"],
+    "telemetry": ["ScraperMetrics", "metrics"],
+    "resources": ["ResourceMonitor"],
+    "storage": ["BlobStore"],
+    "client": [
+        "CLIENT_HEADERS", "RateLimitStatus", "RateLimitGovernor", "TokenPool", "get_token_pool",
+        "RetryPolicy", "CircuitOpenError", "CircuitBreaker", "HTTPCache", "RecordingTransport",
+        "ReplayTransport", "ScraperSession", "check_rate_limit", "wait_for_rate_limit_reset"
+    ],
+    "db": [
+        "connect_db", "SCHEMA_MIGRATIONS", "SCHEMA_VERSION", "init_db", "DatabaseWriter",
+        "get_db_writer", "load_repository_state", "load_cached_analyses",
+        "store_repository_results", "search_functions"
+    ],
+    "github": [
+        "search_repositories", "list_owner_repositories", "fetch_repository", "REPOSITORY_FIELDS",
+        "fetch_repositories_batch", "fetch_repo_tree", "walk_tree", "FileTooLarge",
+        "stream_to_file", "download_file", "download_archive", "DownloadScheduler"
+    ],
+    "pipeline": ["get_analysis_executor", "AnalysisStage", "process_repository"],
+    "crawler": ["crawl_status", "CrawlEngine", "crawl"],
+    "commands": ["main", "cli"],
+}
+_LOCATIONS = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_LOCATIONS)
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        return importlib.import_module(f"{__name__}.{name}")
+    module = _LOCATIONS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LOCATIONS))
@@ -0,0 +1,3 @@
+from .commands import cli
+
+cli()
@@ -0,0 +1,44 @@
+"""AST analysis of Python sources; imports nothing beyond the standard library"""
+import ast
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+def parse_python_function(node: ast.FunctionDef) -> Dict[str, Any]:
+    """Extract detailed information from Python function"""
+    return {
+        "name": node.name,
+        "parameters": [{
+            "name": arg.arg,
+            "type": ast.unparse(arg.annotation) if arg.annotation else None
+        } for arg in node.args.args],
+        "return_type": ast.unparse(node.returns) if node.returns else None,
+        "docstring": ast.get_docstring(node),
+        "start_line": node.lineno,
+        "end_line": node.end_lineno,
+        "source_code": ast.unparse(node)
+    }
+
+def analyze_python_file(content: str) -> List[Dict[str, Any]]:
+    """Parse Python file and extract functions"""
+    try:
+        tree = ast.parse(content)
+        return [
+            parse_python_function(node)
+            for node in ast.walk(tree)
+            if isinstance(node, ast.FunctionDef) and not node.name.startswith('_')
+        ]
+    except Exception as e:
+        logger.error(f"Python analysis error: {str(e)}")
+        return []
+
+def analyze_python_path(path: str) -> List[Dict[str, Any]]:
+    """Read and analyze one saved file; runs in an analysis worker process"""
+    return analyze_python_file(Path(path).read_text(encoding='utf-8'))
+
+def _timed_analysis(path: str) -> Tuple[List[Dict[str, Any]], float]:
+    started = time.perf_counter()
+    return analyze_python_path(path), time.perf_counter() - started
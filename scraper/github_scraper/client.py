@@ -0,0 +1,709 @@
+"""HTTP layer: pooled session, rate-limit governors, token pool, retries, caching"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .config import ScraperConfig, settings
+from .telemetry import metrics
+from .resources import ResourceMonitor
+from .storage import BlobStore, write_atomic
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Sent with every request; Authorization is added per request by the token pool
+CLIENT_HEADERS = {
+    "Accept": "application/vnd.github.v3+json",
+    "User-Agent": "GitHubScraper/1.0"
+}
+
+@dataclass
+class RateLimitStatus:
+    remaining: int
+    limit: int
+    reset_time: int
+
+class RateLimitGovernor:
+    """Local rate-limit budget fed by the headers of ordinary responses.
+
+    Keeps one budget per GitHub resource (core, search, graphql) and only
+    sleeps when that budget is spent or GitHub asked us to back off via
+    ``Retry-After``. No extra ``/rate_limit`` calls are needed.
+    """
+
+    RESET_BUFFER = 1  # seconds added after the advertised reset time
+    SECONDARY_LIMIT_PAUSE = 60  # GitHub's advice when no Retry-After is given
+
+    def __init__(self):
+        self.budgets: Dict[str, RateLimitStatus] = {}
+        self.blocked_until = 0.0
+        self.sleeps = 0
+
+    @staticmethod
+    def resource_for(url: str) -> Optional[str]:
+        """Which rate-limit bucket a URL draws from (None if unmetered)"""
+        parsed = httpx.URL(url)
+        if parsed.host != httpx.URL(settings.api_url).host:
+            return None
+        if parsed.path.startswith("/search/"):
+            return "search"
+        if parsed.path.startswith("/graphql"):
+            return "graphql"
+        if parsed.path == "/rate_limit":
+            return None
+        return "core"
+
+    async def acquire(self, resource: Optional[str], consume: bool = True):
+        """Wait until a request against ``resource`` is allowed"""
+        while True:
+            now = time.time()
+            if self.blocked_until > now:
+                await self._sleep(self.blocked_until - now, "secondary rate limit", "secondary")
+                continue
+            budget = self.budgets.get(resource) if resource else None
+            if budget is None:
+                return
+            if budget.remaining > 0:
+                if consume:
+                    budget.remaining -= 1
+                return
+            if budget.reset_time + self.RESET_BUFFER > now:
+                await self._sleep(budget.reset_time + self.RESET_BUFFER - now, f"{resource} budget exhausted", resource)
+            # Window rolled over; the next response will tell us the new budget
+            self.budgets.pop(resource, None)
+
+    def update(self, response: httpx.Response) -> bool:
+        """Record rate-limit headers; return True if the request was throttled"""
+        headers = response.headers
+        resource = headers.get("X-RateLimit-Resource") or self.resource_for(str(response.request.url))
+        if resource and "X-RateLimit-Remaining" in headers and "X-RateLimit-Reset" in headers:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_time = int(headers["X-RateLimit-Reset"])
+            budget = self.budgets.get(resource)
+            if budget is None or budget.reset_time != reset_time:
+                self.budgets[resource] = RateLimitStatus(
+                    remaining=remaining,
+                    limit=int(headers.get("X-RateLimit-Limit", remaining)),
+                    reset_time=reset_time
+                )
+            else:
+                # Responses can arrive out of order; never raise the budget
+                budget.remaining = min(budget.remaining, remaining)
+
+        if response.status_code not in (403, 429):
+            return False
+        retry_after = headers.get("Retry-After")
+        if retry_after is not None and retry_after.isdigit():
+            self.blocked_until = max(self.blocked_until, time.time() + int(retry_after))
+            return True
+        if headers.get("X-RateLimit-Remaining") == "0":
+            return True
+        try:
+            secondary = "secondary rate limit" in response.text.lower()
+        except httpx.ResponseNotRead:
+            secondary = False
+        if secondary:
+            self.blocked_until = max(self.blocked_until, time.time() + self.SECONDARY_LIMIT_PAUSE)
+            return True
+        return False
+
+    def available_at(self, resource: Optional[str]) -> float:
+        """Earliest time a request against ``resource`` may be sent"""
+        ready = self.blocked_until
+        budget = self.budgets.get(resource) if resource else None
+        if budget is not None and budget.remaining <= 0:
+            ready = max(ready, budget.reset_time + self.RESET_BUFFER)
+        return ready
+
+    def remaining(self, resource: Optional[str]) -> float:
+        """Known remaining budget (unknown counts as unlimited)"""
+        budget = self.budgets.get(resource) if resource else None
+        return float("inf") if budget is None else budget.remaining
+
+    def refund(self, resource: Optional[str]):
+        """Give back a token for a request GitHub did not charge (304)"""
+        budget = self.budgets.get(resource) if resource else None
+        if budget is not None:
+            budget.remaining = min(budget.limit, budget.remaining + 1)
+
+    def seed(self, resource: str, status: RateLimitStatus):
+        """Set a budget from an explicit ``/rate_limit`` lookup"""
+        self.budgets[resource] = status
+
+    async def _sleep(self, seconds: float, reason: str, kind: str):
+        self.sleeps += 1
+        metrics.rate_limit_sleeps.labels(kind).inc()
+        metrics.rate_limit_sleep_seconds.inc(seconds)
+        logger.warning(f"Rate limit: {reason}. Waiting {seconds:.0f} seconds...")
+        await asyncio.sleep(seconds)
+
+class TokenPool:
+    """Rotates requests over several GitHub tokens.
+
+    Each token has its own RateLimitGovernor. A request goes to the usable
+    token with the most remaining budget for its resource; a token that is
+    throttled (403/429, secondary limit) is set aside until it recovers. We
+    only sleep when every token is exhausted.
+    """
+
+    def __init__(self, tokens: List[str], governors: Optional[Dict[str, RateLimitGovernor]] = None):
+        if not tokens:
+            raise ValueError("TokenPool needs at least one token")
+        governors = governors or {}
+        self.governors = {token: governors.get(token) or RateLimitGovernor() for token in tokens}
+        self.sleeps = 0
+
+    @staticmethod
+    def auth_header(token: str) -> Dict[str, str]:
+        return {"Authorization": f"token {token}"}
+
+    def governor(self, token: Optional[str] = None) -> RateLimitGovernor:
+        return self.governors[token or next(iter(self.governors))]
+
+    async def acquire(self, resource: Optional[str]) -> str:
+        """Pick a token for a request against ``resource``, waiting if none is usable"""
+        while True:
+            now = time.time()
+            best, best_remaining, soonest = None, -1.0, None
+            for token, governor in self.governors.items():
+                ready = governor.available_at(resource)
+                if ready > now:
+                    soonest = ready if soonest is None else min(soonest, ready)
+                    continue
+                remaining = governor.remaining(resource)
+                if remaining > best_remaining:
+                    best, best_remaining = token, remaining
+            if best is not None:
+                await self.governors[best].acquire(resource)
+                return best
+            self.sleeps += 1
+            metrics.rate_limit_sleeps.labels("all_tokens").inc()
+            metrics.rate_limit_sleep_seconds.inc(soonest - now)
+            logger.warning(f"Rate limit: all {len(self.governors)} token(s) exhausted. Waiting {soonest - now:.0f} seconds...")
+            await asyncio.sleep(soonest - now)
+
+    def update(self, token: str, response: httpx.Response) -> bool:
+        """Record a response for the token that sent it; True if throttled"""
+        return self.governors[token].update(response)
+
+    def refund(self, token: str, resource: Optional[str]):
+        self.governors[token].refund(resource)
+
+    def stats(self) -> Dict[str, Any]:
+        """Remaining core budget per token (tokens shown by their last 4 chars)"""
+        return {
+            f"...{token[-4:]}": self.governors[token].remaining("core")
+            for token in self.governors
+        }
+
+_token_pool: Optional[TokenPool] = None
+_token_pool_lock = threading.Lock()
+
+def get_token_pool() -> TokenPool:
+    """One token pool (and so one governor per token) shared by the whole process.
+
+    Built on first use so importing the package does not require a token.
+    """
+    global _token_pool
+    with _token_pool_lock:
+        if _token_pool is None:
+            _token_pool = TokenPool(settings.require_tokens())
+        return _token_pool
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for transient GitHub failures.
+
+    Transport errors (timeouts, resets) and 5xx responses are transient.
+    Idempotent requests are retried on either. Other requests are retried
+    only when the connection failed before anything was sent.
+    """
+
+    RETRY_STATUSES = {500, 502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+    # Raised before the request reached the server, so safe for any method
+    UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+    def __init__(
+        self,
+        max_retries: int = ScraperConfig.MAX_RETRIES,
+        base_delay: float = ScraperConfig.RETRY_BASE_DELAY,
+        max_delay: float = ScraperConfig.RETRY_MAX_DELAY
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+
+    @classmethod
+    def is_transient(cls, error: BaseException) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in cls.RETRY_STATUSES
+        return isinstance(error, httpx.TransportError)
+
+    def should_retry(self, attempt: int, idempotent: bool, error: Optional[BaseException] = None) -> bool:
+        """Whether try number ``attempt`` (0-based) may be retried"""
+        if attempt >= self.max_retries:
+            return False
+        return idempotent or isinstance(error, self.UNSENT_ERRORS)
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def backoff(self, attempt: int):
+        self.retries += 1
+        await asyncio.sleep(self.delay(attempt))
+
+class CircuitOpenError(httpx.TransportError):
+    """Rejected without a request: the endpoint's circuit breaker is open"""
+
+class CircuitBreaker:
+    """Per-endpoint breaker: closed, open after repeated failures, then half-open.
+
+    While open, calls fail fast with CircuitOpenError. Once ``cooldown`` has
+    passed, a single trial call is let through. Success closes the circuit
+    and failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = ScraperConfig.BREAKER_FAILURE_THRESHOLD,
+        cooldown: float = ScraperConfig.BREAKER_COOLDOWN
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.rejections = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def retry_after(self) -> float:
+        """Seconds until the next call would be let through"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def check(self, endpoint: str):
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half-open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return
+        self.rejections += 1
+        raise CircuitOpenError(f"Circuit open for {endpoint}, retry in {self.retry_after():.0f}s")
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self.trial_in_flight:
+                logger.warning(f"Opening circuit after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    @staticmethod
+    def endpoint_for(url: str) -> str:
+        """Group URLs by API route, e.g. api.github.com/repos/*/*/contents"""
+        parsed = httpx.URL(url)
+        segments = [segment for segment in parsed.path.split("/") if segment]
+        if parsed.host != httpx.URL(settings.api_url).host or not segments:
+            return parsed.host
+        if segments[0] == "repos":
+            return f"{parsed.host}/repos/*/*/{segments[3] if len(segments) > 3 else ''}".rstrip("/")
+        if segments[0] in ("users", "orgs"):
+            return f"{parsed.host}/{segments[0]}/*/{segments[2] if len(segments) > 2 else ''}".rstrip("/")
+        return f"{parsed.host}/{'/'.join(segments[:2])}"
+
+class HTTPCache:
+    """On-disk cache of GitHub responses keyed by URL, for conditional requests.
+
+    Entries keep the body with its ``ETag``/``Last-Modified`` validators.
+    Revalidation sends ``If-None-Match``/``If-Modified-Since``; a 304 costs
+    no primary rate-limit quota and the stored body is replayed.
+    """
+
+    # Dropped on replay: the stored body is already decoded
+    SKIP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection"}
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.http_cache_dir)
+        self.hits = 0
+
+    def _path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(url).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url: str, response: httpx.Response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": {
+                key: value for key, value in response.headers.items()
+                if key.lower() not in self.SKIP_HEADERS
+            },
+            "body": response.text
+        }
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, json.dumps(entry).encode('utf-8'))
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def replay(self, entry: Dict[str, Any], not_modified: httpx.Response) -> httpx.Response:
+        """Turn a 304 into the cached 200 response"""
+        self.hits += 1
+        headers = dict(entry["headers"])
+        headers.update(
+            (key, value) for key, value in not_modified.headers.items()
+            if key.lower() not in self.SKIP_HEADERS
+        )
+        return httpx.Response(
+            200,
+            headers=headers,
+            content=entry["body"].encode('utf-8'),
+            request=not_modified.request
+        )
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport and appends every exchange to a JSONL fixture file.
+
+    Request headers (and so tokens) are not recorded. Replay the file with
+    ReplayTransport to rerun a scrape offline.
+    """
+
+    def __init__(self, path: Path, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.path = Path(path)
+        self.transport = transport or httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE)
+        self._lock = threading.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in HTTPCache.SKIP_HEADERS]
+        record = {
+            "key": ReplayTransport.key(request),
+            "status": response.status_code,
+            "headers": headers,
+            "body": base64.b64encode(body).decode()
+        }
+        line = json.dumps(record) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+        return httpx.Response(response.status_code, headers=headers, content=body)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves responses recorded by RecordingTransport, without any network.
+
+    Requests are matched on method, URL and body. Repeated requests replay
+    the recorded responses in order, and the last one repeats after that.
+    Unrecorded requests get a 404.
+    """
+
+    def __init__(self, path: Path):
+        self.responses: Dict[str, List[Dict[str, Any]]] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.responses.setdefault(record["key"], []).append(record)
+        self.misses = 0
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        body_hash = hashlib.sha256(request.content).hexdigest()[:16] if request.content else ""
+        return f"{request.method} {request.url} {body_hash}".rstrip()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        recorded = self.responses.get(self.key(request))
+        if not recorded:
+            self.misses += 1
+            logger.warning(f"No recorded response for {request.method} {request.url}")
+            return httpx.Response(404, json={"message": "Not recorded"})
+        record = recorded.pop(0) if len(recorded) > 1 else recorded[0]
+        return httpx.Response(
+            record["status"], headers=record["headers"], content=base64.b64decode(record["body"])
+        )
+
+class ScraperSession:
+    """Owns one long-lived pooled HTTP client shared by every scraper call.
+
+    Use as an async context manager. Connection reuse is tracked through
+    httpcore trace events so callers can see how many handshakes were saved.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = ScraperConfig.MAX_CONNECTIONS,
+        max_keepalive_connections: int = ScraperConfig.MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = ScraperConfig.KEEPALIVE_EXPIRY,
+        http2: bool = ScraperConfig.HTTP2,
+        timeout: float = ScraperConfig.REQUEST_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_per_host: int = ScraperConfig.MAX_REQUESTS_PER_HOST,
+        tokens: Optional[TokenPool] = None,
+        blob_store: Optional[BlobStore] = None,
+        http_cache: Optional[HTTPCache] = None,
+        monitor: Optional[ResourceMonitor] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2 is not installed, falling back to HTTP/1.1")
+            http2 = False
+        self.client = httpx.AsyncClient(
+            # Authorization is added per request by the token pool
+            headers=dict(CLIENT_HEADERS),
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            transport=transport
+        )
+        self.request_count = 0
+        self.connections_opened = 0
+        self.max_per_host = max_per_host
+        self.tokens = tokens or get_token_pool()
+        self.blob_store = blob_store or BlobStore()
+        self.http_cache = http_cache or HTTPCache()
+        self.monitor = monitor or ResourceMonitor()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def reused_connections(self) -> int:
+        """Requests that were served over an already open connection"""
+        return max(0, self.request_count - self.connections_opened)
+
+    async def _trace(self, event: str, info: Dict[str, Any]):
+        if event == "connection.connect_tcp.started":
+            self.connections_opened += 1
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_slots[host]
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        cache: bool = False,
+        token: Optional[str] = None,
+        stream: bool = False,
+        idempotent: Optional[bool] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """Send through the shared pool, capped per host and rate-limit governed.
+
+        The request is authorized with the pool token that has the most
+        budget left (or ``token`` if given); throttled requests are retried,
+        usually on another token. Transport errors and 5xx responses are
+        retried with backoff per ``retry_policy`` (POST only when
+        ``idempotent=True``), and each API route has a circuit breaker that
+        fails fast with CircuitOpenError while the route keeps failing.
+        With ``cache=True`` (GET only) the response
+        is revalidated against the on-disk HTTP cache instead of re-downloaded.
+        With ``stream=True`` the body is left unread and the caller must close
+        the response; prefer the ``stream()`` context manager.
+        """
+        extensions = kwargs.pop("extensions", {})
+        extensions.setdefault("trace", self._trace)
+        follow_redirects = kwargs.pop("follow_redirects", False)
+        resource = RateLimitGovernor.resource_for(url)
+        headers = dict(kwargs.pop("headers", None) or {})
+        
+        entry = None
+        cache = cache and method == "GET" and not stream
+        if cache:
+            cache_key = str(self.client.build_request("GET", url, params=kwargs.get("params")).url)
+            entry = await asyncio.to_thread(self.http_cache.load, cache_key)
+            if entry:
+                headers.update(HTTPCache.conditional_headers(entry))
+        
+        if idempotent is None:
+            idempotent = method in RetryPolicy.IDEMPOTENT_METHODS
+        endpoint = CircuitBreaker.endpoint_for(url)
+        breaker = self.breakers.setdefault(endpoint, CircuitBreaker())
+        throttled = failures = 0
+        while True:
+            breaker.check(endpoint)
+            if token:
+                used_token = token
+                await self.tokens.governor(token).acquire(resource)
+            else:
+                used_token = await self.tokens.acquire(resource)
+            try:
+                async with self._host_slot(url):
+                    self.request_count += 1
+                    request = self.client.build_request(
+                        method,
+                        url,
+                        headers={**headers, **TokenPool.auth_header(used_token)},
+                        extensions=extensions,
+                        **kwargs
+                    )
+                    started = time.perf_counter()
+                    response = await self.client.send(request, stream=stream, follow_redirects=follow_redirects)
+                metrics.request_seconds.labels(endpoint).observe(time.perf_counter() - started)
+                metrics.requests.labels(endpoint, str(response.status_code)).inc()
+                if not stream:
+                    metrics.downloaded_bytes.inc(len(response.content))
+            except asyncio.CancelledError:
+                breaker.trial_in_flight = False
+                raise
+            except httpx.TransportError as e:
+                metrics.requests.labels(endpoint, "error").inc()
+                breaker.record_failure()
+                if not self.retry_policy.should_retry(failures, idempotent, e):
+                    raise
+                logger.warning(f"{method} {url} failed ({e!r}), retrying")
+                await self.retry_policy.backoff(failures)
+                failures += 1
+                continue
+            
+            if stream and response.status_code in (403, 429):
+                # The error body is small, and needed to spot a secondary rate limit
+                await response.aread()
+            if self.tokens.update(used_token, response):
+                breaker.record_success()  # the route is up, just rate limited
+                throttled += 1
+                if throttled > ScraperConfig.MAX_RETRIES:
+                    break
+            elif response.status_code in RetryPolicy.RETRY_STATUSES:
+                breaker.record_failure()
+                if not self.retry_policy.should_retry(failures, idempotent):
+                    break
+                logger.warning(f"{method} {url} returned {response.status_code}, retrying")
+                if stream:
+                    await response.aclose()
+                await self.retry_policy.backoff(failures)
+                failures += 1
+                continue
+            else:
+                breaker.record_success()
+                break
+            if stream:
+                await response.aclose()
+        
+        if entry and response.status_code == 304:
+            self.tokens.refund(used_token, resource)
+            return self.http_cache.replay(entry, response)
+        if cache and response.status_code == 200:
+            await asyncio.to_thread(self.http_cache.store, cache_key, response)
+        return response
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs):
+        """Like request(), but yields the response with its body unread"""
+        response = await self.request(method, url, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.request_count,
+            "connections_opened": self.connections_opened,
+            "reused_connections": self.reused_connections,
+            "not_modified": self.http_cache.hits,
+            "memory_throttle_events": self.monitor.throttle_events,
+            "retries": self.retry_policy.retries,
+            "circuit_rejections": sum(b.rejections for b in self.breakers.values())
+        }
+
+    async def aclose(self):
+        await self.monitor.stop()
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "ScraperSession":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+async def check_rate_limit(session: ScraperSession, token: Optional[str] = None) -> RateLimitStatus:
+    """Check current GitHub API rate limit status (of the first pool token by default)"""
+    token = token or next(iter(session.tokens.governors))
+    response = await session.get(f"{settings.api_url}/rate_limit", token=token)
+    response.raise_for_status()
+    data = response.json()["resources"]["core"]
+    status = RateLimitStatus(
+        remaining=data["remaining"],
+        limit=data["limit"],
+        reset_time=data["reset"]
+    )
+    session.tokens.governor(token).seed("core", status)
+    return status
+
+async def wait_for_rate_limit_reset(session: ScraperSession):
+    """Wait until rate limit resets.
+
+    Not needed before ordinary requests: ScraperSession.get consults the
+    shared TokenPool, whose governors are kept current from response headers.
+    """
+    for token in session.tokens.governors:
+        await check_rate_limit(session, token)
+    ready = min(governor.available_at("core") for governor in session.tokens.governors.values())
+    wait_time = ready - time.time()
+    if wait_time > 0:
+        logger.warning(f"Rate limit exceeded. Waiting {wait_time:.0f} seconds...")
+        await asyncio.sleep(wait_time)
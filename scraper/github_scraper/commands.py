@@ -0,0 +1,126 @@
+"""Command line interface: interactive scrape, search and crawl"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .client import RecordingTransport, ReplayTransport, ScraperSession
+from .config import ScraperConfig, configure_logging
+from .crawler import crawl
+from .db import init_db, search_functions
+from .github import search_repositories
+from .telemetry import metrics
+from .pipeline import process_repository
+
+async def main():
+    init_db()
+    
+    # Ask for organization/owner name first
+    owner = input("Enter GitHub owner/organization: ").strip()
+    
+    # Ask for optional filters
+    language = input("Filter by language (python/js/go, leave blank for any): ").strip() or None
+    min_stars_input = input("Minimum stars (0 for any): ").strip()
+    min_stars = int(min_stars_input) if min_stars_input.isdigit() else 0
+    
+    # Search repositories under the owner with filters
+    query = f"user:{owner}"
+    if language:
+        query += f" language:{language}"
+    if min_stars > 0:
+        query += f" stars:>={min_stars}"
+    
+    async with ScraperSession() as session:
+        results = await search_repositories(
+            session,
+            query=query,
+            max_results=10
+        )
+        
+        if not results:
+            print(f"No repositories found for owner '{owner}' with the given filters.")
+            return
+        
+        print("\nSearch Results:")
+        for i, repo in enumerate(results, 1):
+            print(f"{i}. {repo['full_name']} - {repo['description']} (★{repo['stargazers_count']})")
+        
+        choice_input = input(f"\nSelect repo to scrape (1-{len(results)}): ").strip()
+        if not choice_input.isdigit() or not (1 <= int(choice_input) <= len(results)):
+            print("Invalid selection. Exiting.")
+            return
+        choice = int(choice_input)
+        selected = results[choice - 1]
+        owner, repo = selected["full_name"].split("/")
+        
+        print(f"\nStarting scrape of {owner}/{repo}...")
+        result = await process_repository(owner, repo, session=session)
+        print("\nScraping result:", result)
+
+def cli(argv: Optional[List[str]] = None):
+    """Command line entry point; without a subcommand runs the interactive scraper"""
+    parser = argparse.ArgumentParser(description="GitHub scraper")
+    subcommands = parser.add_subparsers(dest="command")
+    
+    search = subcommands.add_parser("search", help="Full-text search over scraped functions")
+    search.add_argument("query", help="Words to match in function names, docstrings, parameters and source")
+    search.add_argument("--language", help="File language, e.g. python")
+    search.add_argument("--repo", help="Restrict to one repository (owner/name)")
+    search.add_argument("--min-stars", type=int, help="Minimum repository stars")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--raw", action="store_true", help="Treat the query as FTS5 syntax")
+    
+    crawl_parser = subcommands.add_parser(
+        "crawl", help="Crawl whole organizations and search results (resumable)"
+    )
+    crawl_parser.add_argument("--owner", action="append", default=[], help="User or organization to crawl (repeatable)")
+    crawl_parser.add_argument("--query", action="append", default=[], help="Repository search query (repeatable)")
+    crawl_parser.add_argument("--max-results", type=int, default=100, help="Search results to queue per query")
+    crawl_parser.add_argument("--concurrency", type=int, default=ScraperConfig.CRAWL_CONCURRENCY)
+    crawl_parser.add_argument("--extensions", nargs="+", default=[".py"])
+    crawl_parser.add_argument("--fetch-mode", choices=["auto", "files", "archive"], default="auto")
+    crawl_parser.add_argument("--include", action="append", default=[], help="Only scrape paths matching this gitignore-style glob (repeatable)")
+    crawl_parser.add_argument("--exclude", action="append", default=[], help="Skip paths matching this gitignore-style glob; '!glob' re-includes (repeatable)")
+    crawl_parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this port while crawling")
+    crawl_parser.add_argument("--metrics-file", type=Path, help="Write Prometheus metrics to this file when the crawl ends")
+    replay_group = crawl_parser.add_mutually_exclusive_group()
+    replay_group.add_argument("--record", type=Path, help="Append every HTTP exchange to this JSONL fixture")
+    replay_group.add_argument("--replay", type=Path, help="Serve HTTP responses from a recorded fixture instead of GitHub")
+    
+    args = parser.parse_args(argv)
+    configure_logging()
+    if args.command == "crawl":
+        if args.metrics_port:
+            metrics.serve(args.metrics_port)
+        # With no owners or queries this just resumes the pending queue
+        transport = None
+        if args.record:
+            transport = RecordingTransport(args.record)
+        elif args.replay:
+            transport = ReplayTransport(args.replay)
+        try:
+            counts = asyncio.run(crawl(
+                args.owner, args.query, args.max_results, args.concurrency,
+                args.extensions, args.fetch_mode, args.include, args.exclude, transport
+            ))
+        finally:
+            if args.metrics_file:
+                metrics.write(args.metrics_file)
+        print("Crawl finished:", counts)
+    elif args.command == "search":
+        init_db()
+        started = time.perf_counter()
+        results = search_functions(
+            args.query, language=args.language, repo=args.repo,
+            min_stars=args.min_stars, limit=args.limit, raw=args.raw
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for i, hit in enumerate(results, 1):
+            params = ", ".join(p["name"] for p in hit["parameters"])
+            print(f"{i}. {hit['name']}({params}) - {hit['repository']}/{hit['path']}:{hit['start_line']} (★{hit['stars']})")
+            if hit["docstring_snippet"]:
+                print(f"   {hit['docstring_snippet']}")
+        print(f"\n{len(results)} result(s) in {elapsed_ms:.1f} ms")
+    else:
+        asyncio.run(main())
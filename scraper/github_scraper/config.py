@@ -0,0 +1,107 @@
+"""Scraper settings.
+
+Nothing here touches the environment at import time. ``settings`` reads
+``.env`` and the environment on first attribute access, and any value can
+be overridden by assigning to it (tests point the paths at a temp dir).
+Tokens are only checked when a client actually needs them.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+# Directory patterns to skip
+SKIP_PATTERNS = {
+    r'test[s]?/', r'__pycache__/', r'\.github/', r'docs/', 
+    r'examples/', r'migrations/', r'venv/', r'env/',
+    r'node_modules/', r'dist/', r'build/'
+}
+
+class ScraperConfig:
+    MAX_FILE_SIZE = 1_000_000  # 1MB
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes per streamed read
+    BATCH_SIZE = 20
+    MAX_RETRIES = 3 
+    RETRY_BASE_DELAY = 0.5  # seconds; backoff doubles per attempt, with full jitter
+    RETRY_MAX_DELAY = 30.0
+    BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures that open an endpoint's circuit
+    BREAKER_COOLDOWN = 30.0  # seconds an open circuit rejects calls before a trial request
+    MEMORY_THRESHOLD = 0.8  # 80% memory usage
+    MEMORY_RECOVERY_MARGIN = 0.1  # restore concurrency below THRESHOLD - MARGIN
+    MEMORY_CHECK_INTERVAL = 1.0  # seconds between memory samples
+    # Shared HTTP client pool
+    MAX_CONNECTIONS = 20
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection stays in the pool
+    REQUEST_TIMEOUT = 30.0
+    HTTP2 = True
+    MAX_REQUESTS_PER_HOST = 10  # concurrent in-flight requests per host
+    ARCHIVE_THRESHOLD = 200  # "auto" fetch mode switches to the tarball above this many files
+    DB_BUSY_TIMEOUT = 30.0  # seconds to wait on a locked database
+    DB_WRITE_BATCH = 32  # repository jobs grouped into one write transaction
+    ANALYSIS_WORKERS = os.cpu_count() or 1  # processes parsing downloaded files
+    CRAWL_CONCURRENCY = 4  # repositories processed at once by the crawl engine
+    SEARCH_RESULT_CAP = 1000  # GitHub never returns more search results than this
+    GRAPHQL_BATCH_SIZE = 50  # repositories per GraphQL metadata query
+    METADATA_MAX_AGE_HOURS = 24  # stored metadata newer than this skips fetch_repository
+    SPARSE_TREE_MIN_REPO_KB = 500_000  # repos this large skip the recursive tree request
+    TREE_WALK_CONCURRENCY = 8  # subtree listings fetched at once by the sparse walker
+
+class Settings:
+    """Environment-derived settings, loaded lazily.
+
+    ``api_url`` comes from GITHUB_API_URL. ``tokens`` comes from
+    GITHUB_TOKEN plus the comma-separated GITHUB_TOKENS, whose quotas are
+    used together. The rest are local paths.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not set yet
+        if name.startswith("_") or self.__dict__.get("_loaded"):
+            raise AttributeError(name)
+        self._load()
+        return getattr(self, name)
+
+    def _load(self):
+        from dotenv import load_dotenv
+        load_dotenv()
+        token = os.getenv("GITHUB_TOKEN")
+        tokens = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()]
+        if token and token not in tokens:
+            tokens.insert(0, token)
+        defaults: Dict[str, Any] = {
+            "api_url": os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/"),
+            "tokens": tokens,
+            "db_file": "scraped_repos.db",
+            "repos_dir": PACKAGE_DIR / "scraped_repos",
+            "blob_store_dir": PACKAGE_DIR / "blob_store",
+            "http_cache_dir": PACKAGE_DIR / "http_cache",
+            "max_cache_age_days": 7,  # Refresh repos older than this
+        }
+        for key, value in defaults.items():
+            self.__dict__.setdefault(key, value)
+        self._loaded = True
+
+    def require_tokens(self) -> List[str]:
+        if not self.tokens:
+            raise ValueError("❌ GitHub token not found! Set the GITHUB_TOKEN or GITHUB_TOKENS environment variable.")
+        return self.tokens
+
+    def reload(self):
+        """Forget overrides and re-read the environment on next access"""
+        self.__dict__.clear()
+
+settings = Settings()
+
+def configure_logging(log_file: str = "scraper.log"):
+    """Log to ``log_file`` and the console; called by the CLI, never on import"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
@@ -0,0 +1,174 @@
+"""Resumable multi-repository crawl engine backed by the crawl_jobs table"""
+import asyncio
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .client import ScraperSession
+from .config import ScraperConfig
+from .db import connect_db, get_db_writer, init_db
+from .filters import PathFilter
+from .github import fetch_repositories_batch, list_owner_repositories, search_repositories
+from .pipeline import process_repository
+
+logger = logging.getLogger(__name__)
+
+def _enqueue_crawl_jobs(conn: sqlite3.Connection, full_names: List[str], source: str) -> int:
+    before = conn.total_changes
+    conn.executemany(
+        "INSERT OR IGNORE INTO crawl_jobs (owner, name, source) VALUES (?, ?, ?)",
+        [(*full_name.split("/", 1), source) for full_name in full_names]
+    )
+    return conn.total_changes - before
+
+def _claim_crawl_job(conn: sqlite3.Connection) -> Optional[Tuple[int, str, str]]:
+    job = conn.execute(
+        "SELECT id, owner, name FROM crawl_jobs WHERE status = 'pending' ORDER BY id LIMIT 1"
+    ).fetchone()
+    if job:
+        conn.execute(
+            "UPDATE crawl_jobs SET status = 'running', attempts = attempts + 1, "
+            "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (job[0],)
+        )
+    return job
+
+def _finish_crawl_job(conn: sqlite3.Connection, job_id: int, result: Dict[str, Any], max_attempts: int):
+    # "partial" results are stored; their failed files are retried on the next scrape
+    if result.get("status") in ("success", "partial", "cached"):
+        status = "done"
+    else:
+        attempts = conn.execute("SELECT attempts FROM crawl_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+        status = "pending" if attempts < max_attempts else "failed"
+    conn.execute(
+        "UPDATE crawl_jobs SET status = ?, error = ?, result_json = ?, "
+        "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (status, result.get("error"), json.dumps(result), job_id)
+    )
+
+def _recover_crawl_jobs(conn: sqlite3.Connection) -> int:
+    # Jobs left running by a crashed process start over
+    return conn.execute(
+        "UPDATE crawl_jobs SET status = 'pending' WHERE status = 'running'"
+    ).rowcount
+
+def crawl_status() -> Dict[str, int]:
+    """Number of crawl jobs per status"""
+    conn = connect_db()
+    try:
+        return dict(conn.execute("SELECT status, COUNT(*) FROM crawl_jobs GROUP BY status"))
+    finally:
+        conn.close()
+
+class CrawlEngine:
+    """Non-interactive multi-repository crawler backed by the crawl_jobs table.
+
+    Repositories from owners and search results are queued in SQLite and
+    processed ``concurrency`` at a time over one shared session, whose
+    per-host cap and rate-limit governor bound the total request load.
+    Completed jobs are never redone, and jobs interrupted by a crash are
+    picked up again on the next run.
+    """
+
+    def __init__(
+        self,
+        session: ScraperSession,
+        concurrency: int = ScraperConfig.CRAWL_CONCURRENCY,
+        file_extensions: List[str] = [".py"],
+        fetch_mode: str = "auto",
+        force_refresh: bool = False,
+        path_filter: Optional[PathFilter] = None
+    ):
+        self.session = session
+        self.concurrency = max(1, concurrency)
+        self.file_extensions = file_extensions
+        self.fetch_mode = fetch_mode
+        self.force_refresh = force_refresh
+        self.path_filter = path_filter
+        self.processed = 0
+
+    async def enqueue_owner(self, owner: str) -> int:
+        """Queue every repository of a user or organization"""
+        repos = await list_owner_repositories(self.session, owner)
+        return await get_db_writer().submit(
+            _enqueue_crawl_jobs, [r["full_name"] for r in repos], f"owner:{owner}"
+        )
+
+    async def enqueue_search(self, query: str, max_results: int = 100, **filters) -> int:
+        """Queue the repositories matched by a search query"""
+        repos = await search_repositories(self.session, query, max_results=max_results, **filters)
+        return await get_db_writer().submit(
+            _enqueue_crawl_jobs, [r["full_name"] for r in repos], f"search:{query}"
+        )
+
+    async def enqueue(self, full_names: List[str], source: str = "manual") -> int:
+        """Queue explicit owner/name pairs"""
+        return await get_db_writer().submit(_enqueue_crawl_jobs, full_names, source)
+
+    async def prefetch_metadata(self):
+        """Batch-fetch metadata of pending jobs so each job skips fetch_repository"""
+        def pending_names(conn):
+            return [f"{owner}/{name}" for owner, name in conn.execute(
+                "SELECT owner, name FROM crawl_jobs WHERE status = 'pending'"
+            )]
+        full_names = await get_db_writer().submit(pending_names)
+        if full_names:
+            fetched = await fetch_repositories_batch(self.session, full_names)
+            logger.info(f"Prefetched metadata for {len(fetched)}/{len(full_names)} queued repositories")
+
+    async def run(self) -> Dict[str, int]:
+        """Process queued jobs until none are pending; returns status counts"""
+        writer = get_db_writer()
+        recovered = await writer.submit(_recover_crawl_jobs)
+        if recovered:
+            logger.info(f"Resuming {recovered} interrupted crawl job(s)")
+        await self.prefetch_metadata()
+
+        async def worker():
+            while True:
+                job = await writer.submit(_claim_crawl_job)
+                if job is None:
+                    return
+                job_id, owner, name = job
+                try:
+                    result = await process_repository(
+                        owner, name, self.file_extensions, self.force_refresh,
+                        session=self.session, fetch_mode=self.fetch_mode,
+                        path_filter=self.path_filter
+                    )
+                except Exception as e:
+                    logger.error(f"Crawl job {owner}/{name} crashed: {e}")
+                    result = {"status": "failed", "error": str(e)}
+                await writer.submit(_finish_crawl_job, job_id, result, ScraperConfig.MAX_RETRIES)
+                self.processed += 1
+                logger.info(f"Crawled {owner}/{name}: {result.get('status')}")
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return await asyncio.to_thread(crawl_status)
+
+async def crawl(
+    owners: List[str],
+    queries: List[str],
+    max_results: int = 100,
+    concurrency: int = ScraperConfig.CRAWL_CONCURRENCY,
+    file_extensions: List[str] = [".py"],
+    fetch_mode: str = "auto",
+    include: List[str] = (),
+    exclude: List[str] = (),
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> Dict[str, int]:
+    """Queue the given owners and searches, then crawl everything pending"""
+    init_db()
+    path_filter = PathFilter(file_extensions, include=include, exclude=exclude)
+    async with ScraperSession(transport=transport) as session:
+        engine = CrawlEngine(session, concurrency, file_extensions, fetch_mode, path_filter=path_filter)
+        for owner in owners:
+            added = await engine.enqueue_owner(owner)
+            logger.info(f"Queued {added} new repositories from {owner}")
+        for query in queries:
+            added = await engine.enqueue_search(query, max_results)
+            logger.info(f"Queued {added} new repositories for '{query}'")
+        return await engine.run()
@@ -0,0 +1,538 @@
+"""SQLite schema, migrations, the batching writer thread and read helpers"""
+import asyncio
+import atexit
+import calendar
+import concurrent.futures
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import ScraperConfig, settings
+from .telemetry import metrics
+
+logger = logging.getLogger(__name__)
+
+def connect_db(db_file: Optional[str] = None, **kwargs) -> sqlite3.Connection:
+    """Open the scrape database with WAL journaling and tuned pragmas"""
+    conn = sqlite3.connect(db_file or settings.db_file, timeout=ScraperConfig.DB_BUSY_TIMEOUT, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+def _schema_v1(conn: sqlite3.Connection):
+    """Original tables (idempotent so legacy databases adopt versioning)"""
+    # Repositories table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS repositories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            owner TEXT NOT NULL,
+            name TEXT NOT NULL,
+            language TEXT,
+            stars INTEGER DEFAULT 0,
+            forks INTEGER DEFAULT 0,
+            last_updated TEXT,
+            scraped_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            metadata_json TEXT,
+            UNIQUE(owner, name)
+        )
+    """)
+    
+    # Files table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            repo_id INTEGER,
+            path TEXT NOT NULL,
+            sha TEXT,
+            language TEXT,
+            function_count INTEGER DEFAULT 0,
+            FOREIGN KEY (repo_id) REFERENCES repositories(id),
+            UNIQUE(repo_id, path)
+        )
+    """)
+    
+    # Functions table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS functions (
+            file_id INTEGER,
+            name TEXT NOT NULL,
+            parameters TEXT,  -- JSON array
+            return_type TEXT,
+            docstring TEXT,
+            start_line INTEGER,
+            end_line INTEGER,
+            source_code TEXT,
+            FOREIGN KEY (file_id) REFERENCES files(id),
+            UNIQUE(file_id, name)
+        )
+    """)
+    
+    # Parse results per git blob SHA, shared by every repo containing the blob
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS blob_analysis (
+            sha TEXT PRIMARY KEY,
+            language TEXT,
+            functions_json TEXT,
+            analyzed_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def _schema_v2(conn: sqlite3.Connection):
+    """Stable integer keys, cascading deletes and lookup indexes.
+
+    files gains an explicit ``id`` (seeded from the old rowid, which is what
+    functions.file_id held) and orphaned rows are dropped on the way.
+    """
+    conn.execute("""
+        CREATE TABLE files_new (
+            id INTEGER PRIMARY KEY,
+            repo_id INTEGER NOT NULL REFERENCES repositories(id) ON DELETE CASCADE,
+            path TEXT NOT NULL,
+            sha TEXT,
+            language TEXT,
+            function_count INTEGER DEFAULT 0,
+            UNIQUE(repo_id, path)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO files_new (id, repo_id, path, sha, language, function_count)
+        SELECT rowid, repo_id, path, sha, language, function_count FROM files
+        WHERE repo_id IN (SELECT id FROM repositories)
+    """)
+    conn.execute("DROP TABLE files")
+    conn.execute("ALTER TABLE files_new RENAME TO files")
+    
+    conn.execute("""
+        CREATE TABLE functions_new (
+            id INTEGER PRIMARY KEY,
+            file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            parameters TEXT,  -- JSON array
+            return_type TEXT,
+            docstring TEXT,
+            start_line INTEGER,
+            end_line INTEGER,
+            source_code TEXT,
+            UNIQUE(file_id, name)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO functions_new
+            (file_id, name, parameters, return_type, docstring, start_line, end_line, source_code)
+        SELECT file_id, name, parameters, return_type, docstring, start_line, end_line, source_code
+        FROM functions WHERE file_id IN (SELECT id FROM files)
+    """)
+    conn.execute("DROP TABLE functions")
+    conn.execute("ALTER TABLE functions_new RENAME TO functions")
+    
+    # Covering indexes for the lookups we run
+    conn.execute("CREATE INDEX idx_functions_name ON functions(name, file_id)")
+    conn.execute("CREATE INDEX idx_files_repo ON files(repo_id, path, sha)")
+    conn.execute("CREATE INDEX idx_repositories_language_stars ON repositories(language, stars DESC)")
+    conn.execute("CREATE INDEX idx_repositories_stars ON repositories(stars DESC)")
+
+def _schema_v3(conn: sqlite3.Connection):
+    """FTS5 index over function name, docstring, parameters and source.
+
+    External-content table kept in sync with ``functions`` by triggers, so
+    every write path (including cascading deletes) updates it.
+    """
+    conn.execute("""
+        CREATE VIRTUAL TABLE functions_fts USING fts5(
+            name, docstring, parameters, source_code,
+            content='functions', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER functions_fts_insert AFTER INSERT ON functions BEGIN
+            INSERT INTO functions_fts (rowid, name, docstring, parameters, source_code)
+            VALUES (new.id, new.name, new.docstring, new.parameters, new.source_code);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER functions_fts_delete AFTER DELETE ON functions BEGIN
+            INSERT INTO functions_fts (functions_fts, rowid, name, docstring, parameters, source_code)
+            VALUES ('delete', old.id, old.name, old.docstring, old.parameters, old.source_code);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER functions_fts_update AFTER UPDATE ON functions BEGIN
+            INSERT INTO functions_fts (functions_fts, rowid, name, docstring, parameters, source_code)
+            VALUES ('delete', old.id, old.name, old.docstring, old.parameters, old.source_code);
+            INSERT INTO functions_fts (rowid, name, docstring, parameters, source_code)
+            VALUES (new.id, new.name, new.docstring, new.parameters, new.source_code);
+        END
+    """)
+    conn.execute("INSERT INTO functions_fts (functions_fts) VALUES ('rebuild')")
+
+def _schema_v4(conn: sqlite3.Connection):
+    """Persistent job queue for the crawl engine"""
+    conn.execute("""
+        CREATE TABLE crawl_jobs (
+            id INTEGER PRIMARY KEY,
+            owner TEXT NOT NULL,
+            name TEXT NOT NULL,
+            source TEXT,  -- search query or owner that enqueued the job
+            status TEXT NOT NULL DEFAULT 'pending',  -- pending, running, done, failed
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            result_json TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(owner, name)
+        )
+    """)
+    conn.execute("CREATE INDEX idx_crawl_jobs_status ON crawl_jobs(status, id)")
+
+def _schema_v5(conn: sqlite3.Connection):
+    """Track metadata freshness separately from file scraping.
+
+    Batch metadata fetches create rows with ``scraped_at`` NULL, so they are
+    not mistaken for scraped repositories.
+    """
+    conn.execute("ALTER TABLE repositories ADD COLUMN metadata_fetched_at TEXT")
+    conn.execute("UPDATE repositories SET metadata_fetched_at = scraped_at")
+
+# Migration N upgrades a database from user_version N-1 to N
+SCHEMA_MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _schema_v1,
+    _schema_v2,
+    _schema_v3,
+    _schema_v4,
+    _schema_v5,
+]
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
+
+def init_db():
+    """Initialize the database, applying pending schema migrations"""
+    conn = connect_db(isolation_level=None)
+    try:
+        # Table rebuilds must not trip foreign key checks midway
+        conn.execute("PRAGMA foreign_keys=OFF")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                SCHEMA_MIGRATIONS[target - 1](conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            logger.info(f"Database schema migrated to version {target}")
+    finally:
+        conn.close()
+
+class DatabaseWriter:
+    """Dedicated writer thread for scrape results.
+
+    Jobs are plain functions taking a connection. Concurrent repository jobs
+    queue them through ``submit``; the thread groups whatever is waiting into
+    one transaction (each job in its own savepoint), so many scrapes can
+    write at once without "database is locked" stalls or blocking the event
+    loop.
+    """
+
+    def __init__(self, db_file: Optional[str] = None, max_batch: int = ScraperConfig.DB_WRITE_BATCH):
+        self.db_file = db_file or settings.db_file
+        self.max_batch = max_batch
+        self.jobs: "queue.Queue" = queue.Queue()
+        self.transactions = 0
+        self.thread = threading.Thread(target=self._run, name="scraper-db-writer", daemon=True)
+        self.thread.start()
+
+    async def submit(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(conn, *args) on the writer thread and await its result"""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self.jobs.put((fn, args, future))
+        return await asyncio.wrap_future(future)
+
+    def close(self):
+        """Flush queued jobs and stop the thread"""
+        if self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join()
+
+    def _run(self):
+        conn = connect_db(self.db_file, isolation_level=None)
+        try:
+            stopping = False
+            while not stopping:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                batch = [job]
+                while len(batch) < self.max_batch:
+                    try:
+                        job = self.jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stopping = True
+                        break
+                    batch.append(job)
+                self._write_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[Callable, tuple, Any]]):
+        done = []
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = fn(conn, *args)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    future.set_exception(e)
+                    continue
+                conn.execute("RELEASE job")
+                done.append((future, result))
+            conn.execute("COMMIT")
+            self.transactions += 1
+            metrics.db_write_seconds.observe(time.perf_counter() - started)
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, _ in done:
+                future.set_exception(e)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        # Report only after the commit so callers see durable rows
+        for future, result in done:
+            future.set_result(result)
+
+_db_writer: Optional[DatabaseWriter] = None
+_db_writer_lock = threading.Lock()
+
+def get_db_writer() -> DatabaseWriter:
+    """Process-wide writer for the current settings.db_file"""
+    global _db_writer
+    with _db_writer_lock:
+        if _db_writer is None or _db_writer.db_file != settings.db_file:
+            if _db_writer is not None:
+                _db_writer.close()
+            _db_writer = DatabaseWriter(settings.db_file)
+        return _db_writer
+
+@atexit.register
+def _close_db_writer():
+    if _db_writer is not None:
+        _db_writer.close()
+
+def _age_seconds(timestamp: Optional[str]) -> float:
+    """Age of an SQLite CURRENT_TIMESTAMP value (UTC); infinite if unset"""
+    if not timestamp:
+        return float("inf")
+    return time.time() - calendar.timegm(time.strptime(timestamp, "%Y-%m-%d %H:%M:%S"))
+
+def load_repository_state(owner: str, repo: str) -> Tuple[Optional[Tuple], Dict[str, Tuple[int, Optional[str]]]]:
+    """Return the repository row and its known files as {path: (file_id, sha)}.
+
+    The row is (id, scraped_at, metadata_json, metadata_fetched_at).
+    """
+    conn = connect_db()
+    try:
+        repo_data = conn.execute(
+            "SELECT id, scraped_at, metadata_json, metadata_fetched_at "
+            "FROM repositories WHERE owner = ? AND name = ?",
+            (owner, repo)
+        ).fetchone()
+        if not repo_data:
+            return None, {}
+        rows = conn.execute("SELECT id, path, sha FROM files WHERE repo_id = ?", (repo_data[0],))
+        return repo_data, {path: (file_id, sha) for file_id, path, sha in rows}
+    finally:
+        conn.close()
+
+def load_cached_analyses(shas: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Fetch cached per-blob analysis results"""
+    if not shas:
+        return {}
+    conn = connect_db()
+    try:
+        cached = {}
+        for start in range(0, len(shas), 500):  # stay under SQLite's variable limit
+            chunk = shas[start:start + 500]
+            rows = conn.execute(
+                f"SELECT sha, functions_json FROM blob_analysis WHERE sha IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            cached.update((sha, json.loads(functions_json)) for sha, functions_json in rows)
+        return cached
+    finally:
+        conn.close()
+
+def store_repository_results(
+    conn: sqlite3.Connection,
+    owner: str,
+    repo: str,
+    repo_info: Dict[str, Any],
+    removed_file_ids: List[int],
+    file_rows: List[Tuple[str, Optional[str], Optional[str], List[Dict[str, Any]]]],
+    new_analyses: List[Tuple[str, str, str]]
+) -> int:
+    """Write one repository's scrape results; runs on the writer thread.
+
+    ``file_rows`` holds (path, sha, language, functions) for every file that
+    was (re)downloaded. File ids stay stable across refreshes; a changed
+    file keeps its row and only its functions are replaced. Returns the
+    repository id.
+    """
+    # Upsert keeps the repository id stable so existing file rows stay attached
+    conn.execute(
+        """INSERT INTO repositories 
+        (owner, name, language, stars, forks, last_updated, metadata_json, metadata_fetched_at) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(owner, name) DO UPDATE SET
+            language = excluded.language,
+            stars = excluded.stars,
+            forks = excluded.forks,
+            last_updated = excluded.last_updated,
+            metadata_json = excluded.metadata_json,
+            scraped_at = CURRENT_TIMESTAMP,
+            metadata_fetched_at = CURRENT_TIMESTAMP""",
+        (
+            owner,
+            repo,
+            repo_info.get("language"),
+            repo_info.get("stargazers_count", 0),
+            repo_info.get("forks_count", 0),
+            repo_info.get("updated_at"),
+            json.dumps(repo_info)
+        )
+    )
+    repo_id = conn.execute(
+        "SELECT id FROM repositories WHERE owner = ? AND name = ?", (owner, repo)
+    ).fetchone()[0]
+    
+    # Functions of removed files go with them (ON DELETE CASCADE)
+    conn.executemany("DELETE FROM files WHERE id = ?", [(file_id,) for file_id in removed_file_ids])
+    
+    conn.executemany(
+        "INSERT OR REPLACE INTO blob_analysis (sha, language, functions_json) VALUES (?, ?, ?)",
+        new_analyses
+    )
+    conn.executemany(
+        """INSERT INTO files 
+        (repo_id, path, sha, language, function_count) 
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(repo_id, path) DO UPDATE SET
+            sha = excluded.sha,
+            language = excluded.language,
+            function_count = excluded.function_count""",
+        [(repo_id, path, sha, language, len(functions)) for path, sha, language, functions in file_rows]
+    )
+    file_ids = dict(conn.execute("SELECT path, id FROM files WHERE repo_id = ?", (repo_id,)))
+    conn.executemany("DELETE FROM functions WHERE file_id = ?", [(file_ids[row[0]],) for row in file_rows])
+    conn.executemany(
+        """INSERT INTO functions 
+        (file_id, name, parameters, return_type, docstring, start_line, end_line, source_code) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(file_id, name) DO UPDATE SET
+            parameters = excluded.parameters,
+            return_type = excluded.return_type,
+            docstring = excluded.docstring,
+            start_line = excluded.start_line,
+            end_line = excluded.end_line,
+            source_code = excluded.source_code""",
+        [
+            (
+                file_ids[path],
+                func["name"],
+                json.dumps(func["parameters"]),
+                func["return_type"],
+                func["docstring"],
+                func["start_line"],
+                func["end_line"],
+                func["source_code"]
+            )
+            for path, _, _, functions in file_rows
+            for func in functions
+        ]
+    )
+    return repo_id
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching all words"""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"' for word in words)
+
+def search_functions(
+    query: str,
+    language: Optional[str] = None,
+    repo: Optional[str] = None,
+    min_stars: Optional[int] = None,
+    limit: int = 20,
+    raw: bool = False
+) -> List[Dict[str, Any]]:
+    """Ranked full-text search over scraped functions.
+
+    Matches on name, docstring, parameters and source (name weighted
+    highest). ``language`` filters on the file language, ``repo`` is
+    "owner/name". Pass ``raw=True`` to use FTS5 query syntax directly.
+    """
+    match = query if raw else _fts_query(query)
+    if not match:
+        return []
+    sql = """
+        SELECT f.id, f.name, f.parameters, f.return_type, f.start_line, fi.path,
+               r.owner, r.name, r.stars,
+               snippet(functions_fts, 1, '[', ']', '...', 12),
+               bm25(functions_fts, 10.0, 4.0, 2.0, 1.0) AS rank
+        FROM functions_fts
+        JOIN functions f ON f.id = functions_fts.rowid
+        JOIN files fi ON fi.id = f.file_id
+        JOIN repositories r ON r.id = fi.repo_id
+        WHERE functions_fts MATCH ?
+    """
+    params: List[Any] = [match]
+    if language:
+        sql += " AND fi.language = ? COLLATE NOCASE"
+        params.append(language)
+    if repo:
+        owner, _, name = repo.partition("/")
+        sql += " AND r.owner = ? AND r.name = ?"
+        params.extend([owner, name])
+    if min_stars:
+        sql += " AND r.stars >= ?"
+        params.append(min_stars)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+
+    conn = connect_db()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return [
+        {
+            "function_id": function_id,
+            "name": name,
+            "parameters": json.loads(parameters) if parameters else [],
+            "return_type": return_type,
+            "start_line": start_line,
+            "path": path,
+            "repository": f"{owner}/{repo_name}",
+            "stars": stars,
+            "docstring_snippet": snippet,
+            "rank": rank
+        }
+        for function_id, name, parameters, return_type, start_line, path,
+            owner, repo_name, stars, snippet, rank in rows
+    ]
@@ -0,0 +1,125 @@
+"""Tree-entry path filtering"""
+import functools
+import re
+from typing import List, Optional, Tuple
+
+from .config import SKIP_PATTERNS
+
+class PathFilter:
+    """Compiled tree-entry filter: extension set, SKIP_PATTERNS and globs.
+
+    Built once per scrape and applied to every tree entry. Extensions are
+    matched with a set lookup on the final suffix, SKIP_PATTERNS (searched
+    anywhere in the path, as before) with one combined regex, and
+    ``include``/``exclude`` globs with one anchored regex each.
+
+    Globs follow gitignore rules: a pattern without a slash matches at any
+    depth, a leading slash anchors it to the repository root, a trailing
+    slash matches directories only, ``**`` spans directories, and a
+    matching directory excludes everything below it. ``!pattern`` in
+    ``exclude`` re-includes paths. If ``include`` is given, only paths
+    matching one of its globs are kept. ``extensions=None`` keeps every
+    extension.
+    """
+
+    def __init__(
+        self,
+        extensions: Optional[List[str]] = None,
+        skip_patterns=SKIP_PATTERNS,
+        include: List[str] = (),
+        exclude: List[str] = ()
+    ):
+        self.extensions = None if extensions is None else tuple(extensions)
+        if self.extensions is not None:
+            self._suffixes = {ext for ext in self.extensions if ext.startswith(".") and ext.count(".") == 1}
+            self._long_suffixes = tuple(ext for ext in self.extensions if ext not in self._suffixes)
+        self._skip = self._combine([f"(?:{pattern})" for pattern in sorted(skip_patterns)])
+        negated = [glob[1:] for glob in exclude if glob.startswith("!")]
+        self._exclude = self._combine([self.glob_to_regex(g) for g in exclude if not g.startswith("!")])
+        self._reinclude = self._combine([self.glob_to_regex(g) for g in negated])
+        self._include = self._combine([self.glob_to_regex(g) for g in include])
+
+    @staticmethod
+    def _combine(patterns: List[str]) -> Optional[re.Pattern]:
+        return re.compile("|".join(patterns)) if patterns else None
+
+    @staticmethod
+    def glob_to_regex(glob: str) -> str:
+        """Translate one gitignore-style glob into a regex for fullmatch"""
+        anchored = glob.startswith("/") or "/" in glob.strip("/")
+        directory_only = glob.endswith("/")
+        glob = glob.strip("/")
+        parts, i = [], 0
+        while i < len(glob):
+            if glob.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+                continue
+            if glob.startswith("**", i):
+                parts.append(".*")
+                i += 2
+                continue
+            char = glob[i]
+            if char == "*":
+                parts.append("[^/]*")
+            elif char == "?":
+                parts.append("[^/]")
+            elif char == "[" and "]" in glob[i + 2:]:
+                end = glob.index("]", i + 2)
+                body = glob[i + 1:end]
+                parts.append("[" + ("^" + body[1:] if body.startswith("!") else body) + "]")
+                i = end + 1
+                continue
+            else:
+                parts.append(re.escape(char))
+            i += 1
+        prefix = "" if anchored else "(?:.*/)?"
+        suffix = "/.*" if directory_only else "(?:/.*)?"
+        return f"(?:{prefix}{''.join(parts)}{suffix})"
+
+    def has_extension(self, path: str) -> bool:
+        if self.extensions is None:
+            return True
+        dot = path.rfind(".")
+        if dot != -1 and path[dot:] in self._suffixes:
+            return True
+        return bool(self._long_suffixes) and path.endswith(self._long_suffixes)
+
+    def skips(self, path: str) -> bool:
+        """True if SKIP_PATTERNS or the exclude globs reject the path"""
+        if self._skip is not None and self._skip.search(path):
+            return True
+        if self._exclude is not None and self._exclude.fullmatch(path):
+            return self._reinclude is None or not self._reinclude.fullmatch(path)
+        return False
+
+    def prunes_dir(self, dir_path: str) -> bool:
+        """True if no file below this directory can pass the filter.
+
+        Lets tree walkers skip a directory's listing entirely. Excluded
+        directories are only pruned when there are no ``!`` re-includes.
+        """
+        if self._skip is not None and self._skip.search(dir_path + "/"):
+            return True
+        return (
+            self._exclude is not None and self._reinclude is None
+            and self._exclude.fullmatch(dir_path + "/") is not None
+        )
+
+    def __call__(self, path: str) -> bool:
+        """True if a repository-relative file path should be scraped"""
+        if not self.has_extension(path) or self.skips(path):
+            return False
+        return self._include is None or self._include.fullmatch(path) is not None
+
+@functools.lru_cache(maxsize=32)
+def _default_path_filter(extensions: Optional[Tuple[str, ...]]) -> PathFilter:
+    return PathFilter(extensions)
+
+def should_skip_path(path: str) -> bool:
+    """Check if path matches any skip patterns"""
+    return _default_path_filter(None).skips(path)
+
+def is_wanted_file(path: str, file_extensions: List[str]) -> bool:
+    """Check extension and skip patterns for a repository-relative path"""
+    return _default_path_filter(tuple(file_extensions))(path)
@@ -0,0 +1,541 @@
+"""GitHub API calls: search, metadata, trees and file downloads"""
+import asyncio
+import codecs
+import heapq
+import json
+import logging
+import sqlite3
+import statistics
+import tarfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiofiles
+import httpx
+
+from .client import CircuitBreaker, RetryPolicy, ScraperSession
+from .config import ScraperConfig, settings
+from .db import get_db_writer
+from .filters import PathFilter, _default_path_filter
+from .telemetry import metrics
+from .storage import BlobStore
+
+logger = logging.getLogger(__name__)
+
+async def search_repositories(
+    session: ScraperSession,
+    query: str,
+    language: Optional[str] = None,
+    min_stars: Optional[int] = None,
+    max_results: int = 10
+) -> List[Dict[str, Any]]:
+    """Search GitHub repositories with filters, paginating past 100 results"""
+    params = {"q": query, "per_page": min(max_results, 100)}
+    if language:
+        params["q"] += f" language:{language}"
+    if min_stars:
+        params["q"] += f" stars:>={min_stars}"
+    
+    max_results = min(max_results, ScraperConfig.SEARCH_RESULT_CAP)
+    items: List[Dict[str, Any]] = []
+    page = 1
+    try:
+        while len(items) < max_results:
+            response = await session.get(
+                f"{settings.api_url}/search/repositories",
+                params={**params, "page": page},
+                cache=True
+            )
+            response.raise_for_status()
+            page_items = response.json()["items"]
+            items.extend(page_items)
+            if len(page_items) < params["per_page"]:
+                break
+            page += 1
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Search failed: {e.response.status_code} - {e.response.text}")
+    return items[:max_results]
+
+async def list_owner_repositories(session: ScraperSession, owner: str) -> List[Dict[str, Any]]:
+    """List every public repository of a user or organization"""
+    repos: List[Dict[str, Any]] = []
+    page = 1
+    try:
+        while True:
+            response = await session.get(
+                f"{settings.api_url}/users/{owner}/repos",
+                params={"per_page": 100, "page": page, "type": "owner"},
+                cache=True
+            )
+            response.raise_for_status()
+            page_items = response.json()
+            repos.extend(page_items)
+            if len(page_items) < 100:
+                break
+            page += 1
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Failed to list repositories of {owner}: {e}")
+    return repos
+
+async def fetch_repository(session: ScraperSession, owner: str, repo: str) -> Optional[Dict[str, Any]]:
+    """Fetch detailed repository information"""
+    try:
+        response = await session.get(f"{settings.api_url}/repos/{owner}/{repo}", cache=True)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"Failed to fetch repo {owner}/{repo}: {e}")
+        return None
+
+REPOSITORY_FIELDS = """
+    nameWithOwner name owner { login } description isFork
+    stargazerCount forkCount pushedAt updatedAt diskUsage
+    primaryLanguage { name } defaultBranchRef { name }
+"""
+
+def _graphql_to_rest(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a GraphQL repository node like the REST payload the scraper uses"""
+    return {
+        "full_name": node["nameWithOwner"],
+        "name": node["name"],
+        "owner": {"login": node["owner"]["login"]},
+        "description": node.get("description"),
+        "fork": node.get("isFork", False),
+        "stargazers_count": node.get("stargazerCount", 0),
+        "forks_count": node.get("forkCount", 0),
+        "pushed_at": node.get("pushedAt"),
+        "updated_at": node.get("updatedAt"),
+        "size": node.get("diskUsage") or 0,
+        "language": (node.get("primaryLanguage") or {}).get("name"),
+        "default_branch": (node.get("defaultBranchRef") or {}).get("name", "main")
+    }
+
+def _store_repository_metadata(conn: sqlite3.Connection, repos: List[Dict[str, Any]]):
+    # scraped_at stays untouched: metadata alone does not make a repo scraped
+    conn.executemany(
+        """INSERT INTO repositories 
+        (owner, name, language, stars, forks, last_updated, metadata_json, scraped_at, metadata_fetched_at) 
+        VALUES (?, ?, ?, ?, ?, ?, ?, NULL, CURRENT_TIMESTAMP)
+        ON CONFLICT(owner, name) DO UPDATE SET
+            language = excluded.language,
+            stars = excluded.stars,
+            forks = excluded.forks,
+            last_updated = excluded.last_updated,
+            metadata_json = excluded.metadata_json,
+            metadata_fetched_at = CURRENT_TIMESTAMP""",
+        [
+            (
+                info["owner"]["login"],
+                info["name"],
+                info.get("language"),
+                info.get("stargazers_count", 0),
+                info.get("forks_count", 0),
+                info.get("updated_at"),
+                json.dumps(info)
+            )
+            for info in repos
+        ]
+    )
+
+async def fetch_repositories_batch(
+    session: ScraperSession,
+    full_names: List[str],
+    batch_size: int = ScraperConfig.GRAPHQL_BATCH_SIZE,
+    store: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch metadata for many repositories with one GraphQL query per batch.
+
+    Returns REST-shaped metadata keyed by "owner/name" (missing repositories
+    are left out) and, with ``store=True``, upserts it into ``repositories``
+    so process_repository can skip fetch_repository.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(full_names), batch_size):
+        batch = full_names[start:start + batch_size]
+        variables: Dict[str, str] = {}
+        declarations, selections = [], []
+        for i, full_name in enumerate(batch):
+            owner, _, name = full_name.partition("/")
+            variables[f"o{i}"], variables[f"n{i}"] = owner, name
+            declarations.append(f"$o{i}: String!, $n{i}: String!")
+            selections.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ {REPOSITORY_FIELDS} }}")
+        query = f"query({', '.join(declarations)}) {{ {' '.join(selections)} }}"
+        try:
+            response = await session.post(
+                f"{settings.api_url}/graphql", json={"query": query, "variables": variables}, idempotent=True
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error(f"GraphQL metadata batch failed: {e}")
+            continue
+        payload = response.json()
+        data = payload.get("data") or {}
+        for error in payload.get("errors", []):
+            logger.warning(f"GraphQL: {error.get('message')}")
+        for i, full_name in enumerate(batch):
+            node = data.get(f"r{i}")
+            if node:
+                results[full_name] = _graphql_to_rest(node)
+    
+    if store and results:
+        await get_db_writer().submit(_store_repository_metadata, list(results.values()))
+    return results
+
+async def fetch_repo_tree(
+    session: ScraperSession,
+    owner: str,
+    repo: str,
+    ref: str = "main",
+    path_filter: Optional[PathFilter] = None,
+    sparse: bool = False
+) -> List[Dict[str, Any]]:
+    """Fetch the repository file tree.
+
+    Normally one ``recursive=1`` request. If GitHub truncates that listing,
+    or ``sparse`` is set (for huge repositories), the tree is walked one
+    directory at a time instead, skipping directories ``path_filter``
+    prunes so their listings are never downloaded.
+    """
+    branches = [ref, "main", "master"]  # Try multiple branch names
+    last_error = None
+    
+    for branch in branches:
+        try:
+            url = f"{settings.api_url}/repos/{owner}/{repo}/git/trees/{branch}"
+            response = await session.get(url if sparse else f"{url}?recursive=1", cache=True)
+            response.raise_for_status()
+            payload = response.json()
+            break
+        except httpx.HTTPStatusError as e:
+            last_error = e
+            continue
+    else:
+        raise ValueError(f"Failed to fetch tree: {str(last_error)}")
+    
+    if not sparse and not payload.get("truncated"):
+        return payload.get("tree", [])
+    if payload.get("truncated"):
+        logger.warning(f"Tree listing for {owner}/{repo} is truncated, walking subtrees")
+        root = await session.get(f"{settings.api_url}/repos/{owner}/{repo}/git/trees/{payload['sha']}", cache=True)
+        root.raise_for_status()
+        payload = root.json()
+    return await walk_tree(session, owner, repo, payload.get("tree", []), path_filter)
+
+async def walk_tree(
+    session: ScraperSession,
+    owner: str,
+    repo: str,
+    root_entries: List[Dict[str, Any]],
+    path_filter: Optional[PathFilter] = None,
+    concurrency: int = ScraperConfig.TREE_WALK_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """Expand a non-recursive tree listing into full-path entries.
+
+    Subtrees are fetched concurrently by SHA (immutable, so revalidation
+    through the HTTP cache is free); pruned directories are not descended.
+    """
+    entries: List[Dict[str, Any]] = []
+    pending: asyncio.Queue = asyncio.Queue()
+    errors: List[Exception] = []
+
+    def collect(prefix: str, listing: List[Dict[str, Any]]):
+        for item in listing:
+            path = f"{prefix}{item['path']}"
+            entries.append({**item, "path": path})
+            if item["type"] == "tree" and not (path_filter and path_filter.prunes_dir(path)):
+                pending.put_nowait((f"{path}/", item["sha"]))
+
+    async def worker():
+        while True:
+            prefix, sha = await pending.get()
+            try:
+                response = await session.get(f"{settings.api_url}/repos/{owner}/{repo}/git/trees/{sha}", cache=True)
+                response.raise_for_status()
+                payload = response.json()
+                if payload.get("truncated"):
+                    logger.warning(f"Listing of {prefix} in {owner}/{repo} is truncated")
+                collect(prefix, payload.get("tree", []))
+            except Exception as e:
+                # Anything else (a malformed listing, say) must not kill the
+                # worker, or its queue items are never done and join() hangs
+                errors.append(e)
+            finally:
+                pending.task_done()
+
+    collect("", root_entries)
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    try:
+        await pending.join()
+    finally:
+        for task in workers:
+            task.cancel()
+    if errors:
+        raise ValueError(f"Failed to walk tree: {errors[0]}")
+    return entries
+
+class FileTooLarge(Exception):
+    """A download exceeded ScraperConfig.MAX_FILE_SIZE"""
+
+async def stream_to_file(response: httpx.Response, dest: Path, max_size: int) -> int:
+    """Write a streamed body to dest in chunks, validating UTF-8 on the way.
+
+    Raises FileTooLarge as soon as more than ``max_size`` bytes arrive, so
+    oversized bodies are never fully read. Returns the number of bytes.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    written = 0
+    async with aiofiles.open(dest, "wb") as f:
+        async for chunk in response.aiter_bytes(ScraperConfig.DOWNLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            metrics.downloaded_bytes.inc(len(chunk))
+            if written > max_size:
+                raise FileTooLarge(f"larger than {max_size} bytes")
+            decoder.decode(chunk)  # only text sources are kept
+            await f.write(chunk)
+    decoder.decode(b"", final=True)
+    return written
+
+async def download_file(
+    session: ScraperSession,
+    owner: str,
+    repo: str,
+    path: str,
+    save_dir: Path,
+    size: Optional[int] = None
+) -> Optional[Path]:
+    """Download and save a file from GitHub.
+
+    The raw contents are streamed to disk, so memory use does not grow with
+    file size. Files whose tree ``size`` is over ScraperConfig.MAX_FILE_SIZE
+    are skipped without a request, and a body that turns out larger is
+    aborted mid-stream. Returns None for permanent failures; transient ones
+    (see RetryPolicy.is_transient) are raised so callers can retry later.
+    """
+    if size is not None and size > ScraperConfig.MAX_FILE_SIZE:
+        logger.info(f"Skipping {path}: {size} bytes exceeds the size cap")
+        return None
+    
+    tmp_path = session.blob_store.temp_path()
+    try:
+        async with session.stream(
+            "GET",
+            f"{settings.api_url}/repos/{owner}/{repo}/contents/{path}",
+            headers={"Accept": "application/vnd.github.raw"}
+        ) as response:
+            response.raise_for_status()
+            await stream_to_file(response, tmp_path, ScraperConfig.MAX_FILE_SIZE)
+        
+        # Move the file into the blob store and link it into the repo directory
+        save_path = save_dir / path
+        await asyncio.to_thread(session.blob_store.adopt, tmp_path, save_path)
+        return save_path
+            
+    except Exception as e:
+        if RetryPolicy.is_transient(e):
+            raise
+        logger.error(f"Failed to download {path}: {str(e)}")
+        return None
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+async def download_archive(
+    session: ScraperSession,
+    owner: str,
+    repo: str,
+    ref: str,
+    save_dir: Path,
+    file_extensions: List[str],
+    only_paths: Optional[set] = None,
+    on_file: Optional[Callable[[Path], None]] = None,
+    path_filter: Optional[PathFilter] = None
+) -> Optional[List[Path]]:
+    """Download the repository tarball once and extract the wanted files.
+
+    The archive is streamed to a temp file and read back through tarfile,
+    one member at a time; only members within the size cap and passing
+    the same path filter as the tree (and, if given,
+    listed in ``only_paths``) are written. Returns None if the archive could
+    not be fetched. ``on_file`` is called on the event loop with each path
+    as it is written; extraction itself runs in a worker thread so a large
+    archive does not stall other jobs.
+    """
+    archive_path = session.blob_store.temp_path()
+    try:
+        async with session.stream(
+            "GET",
+            f"{settings.api_url}/repos/{owner}/{repo}/tarball/{ref}",
+            follow_redirects=True
+        ) as response:
+            response.raise_for_status()
+            async with aiofiles.open(archive_path, "wb") as f:
+                async for chunk in response.aiter_bytes(ScraperConfig.DOWNLOAD_CHUNK_SIZE):
+                    metrics.downloaded_bytes.inc(len(chunk))
+                    await f.write(chunk)
+        loop = asyncio.get_running_loop()
+        notify = (lambda path: loop.call_soon_threadsafe(on_file, path)) if on_file else None
+        return await asyncio.to_thread(
+            _extract_archive, session.blob_store, archive_path, save_dir,
+            path_filter or _default_path_filter(tuple(file_extensions)), only_paths, notify
+        )
+    except (httpx.HTTPError, tarfile.TarError) as e:
+        logger.error(f"Failed to fetch archive for {owner}/{repo}: {e}")
+        return None
+    finally:
+        archive_path.unlink(missing_ok=True)
+
+def _extract_archive(
+    blob_store: BlobStore,
+    archive_path: Path,
+    save_dir: Path,
+    path_filter: PathFilter,
+    only_paths: Optional[set],
+    on_file: Optional[Callable[[Path], None]]
+) -> List[Path]:
+    saved: List[Path] = []
+    root = save_dir.resolve()
+    with tarfile.open(archive_path, mode="r|gz") as archive:
+        for member in archive:
+            if not member.isfile() or member.size > ScraperConfig.MAX_FILE_SIZE:
+                continue
+            # Members are prefixed with "<owner>-<repo>-<sha>/"
+            _, _, path = member.name.partition("/")
+            if not path or not path_filter(path):
+                continue
+            if only_paths is not None and path not in only_paths:
+                continue
+            save_path = (save_dir / path).resolve()
+            if root not in save_path.parents:
+                logger.warning(f"Skipping archive member outside repo: {member.name}")
+                continue
+            data = archive.extractfile(member).read()
+            try:
+                data.decode('utf-8')
+            except UnicodeDecodeError:
+                logger.warning(f"File {path} is not valid UTF-8, skipping")
+                continue
+            blob_store.save(data, save_dir / path)
+            saved.append(save_dir / path)
+            if on_file:
+                on_file(save_dir / path)
+    return saved
+
+class DownloadScheduler:
+    """Bounded worker pool that downloads tree entries in priority order.
+
+    Replaces one-coroutine-per-file gathering: at most ``workers`` downloads
+    are in flight, the rest wait in a priority queue. Files that fail
+    transiently go to a retry queue, which is drained once the main queue is
+    empty, in up to ``retry_rounds`` rounds spaced by the session's backoff
+    (and any open circuit's cooldown).
+    """
+
+    def __init__(
+        self,
+        session: ScraperSession,
+        workers: int = ScraperConfig.BATCH_SIZE,
+        retry_rounds: int = ScraperConfig.MAX_RETRIES
+    ):
+        self.session = session
+        self.workers = max(1, workers)
+        self.retry_rounds = retry_rounds
+        # One latency per completed file, from its final attempt
+        self.latencies: List[float] = []
+        # Files waiting (main plus retry queue) each time a worker takes one
+        self.depth_samples: List[int] = []
+        self.failed = 0
+        self.retried = 0
+        self.recovered = 0
+        self.transient_errors = 0
+
+    @staticmethod
+    def priority(item: Dict[str, Any]) -> Tuple[int, int, str]:
+        """Small files and likely-public modules first"""
+        name = Path(item["path"]).name
+        private = name.startswith("_") and name != "__init__.py"
+        return (1 if private else 0, item.get("size") or 0, item["path"])
+
+    async def run(
+        self,
+        owner: str,
+        repo: str,
+        items: List[Dict[str, Any]],
+        save_dir: Path,
+        on_file: Optional[Callable[[Path], None]] = None
+    ) -> List[Path]:
+        """Download all items and return the paths that were saved.
+
+        ``on_file`` is called with each path as soon as it is saved.
+        """
+        queue = [(self.priority(item), item["path"], item.get("size")) for item in items]
+        heapq.heapify(queue)
+        metrics.queue_depth.inc(len(queue))
+        downloaded: List[Path] = []
+        retry_queue: List[Tuple[Tuple[int, int, str], str, Optional[int]]] = []
+
+        async def worker():
+            while queue:
+                entry = heapq.heappop(queue)
+                self.depth_samples.append(len(queue) + len(retry_queue))
+                metrics.queue_depth.dec()
+                _, path, size = entry
+                async with self.session.monitor.slot():
+                    started = time.perf_counter()
+                    try:
+                        saved = await download_file(self.session, owner, repo, path, save_dir, size=size)
+                    except Exception as e:
+                        logger.warning(f"Download of {path} failed transiently ({e!r}), queued for retry")
+                        self.transient_errors += 1
+                        retry_queue.append(entry)
+                        continue
+                    self.latencies.append(time.perf_counter() - started)
+                if saved is None:
+                    self.failed += 1
+                else:
+                    downloaded.append(saved)
+                    if on_file:
+                        on_file(saved)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(queue)))))
+        for attempt in range(self.retry_rounds):
+            if not retry_queue:
+                break
+            await self._wait_before_retry(attempt)
+            queue, retry_queue[:] = retry_queue[:], []
+            heapq.heapify(queue)
+            metrics.queue_depth.inc(len(queue))
+            self.retried += len(queue)
+            before = len(downloaded)
+            await asyncio.gather(*(worker() for _ in range(min(self.workers, len(queue)))))
+            self.recovered += len(downloaded) - before
+        if retry_queue:
+            logger.error(f"{owner}/{repo}: giving up on {len(retry_queue)} file(s) after {self.retry_rounds} retry rounds")
+            self.failed += len(retry_queue)
+        return downloaded
+
+    async def _wait_before_retry(self, attempt: int):
+        breaker = self.session.breakers.get(CircuitBreaker.endpoint_for(f"{settings.api_url}/repos/o/r/contents/f"))
+        cooldown = breaker.retry_after() if breaker else 0.0
+        await asyncio.sleep(max(cooldown, self.session.retry_policy.delay(attempt)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth (sampled as workers take files) and per-file latency summary (seconds)"""
+        latencies = sorted(self.latencies)
+        depth = {
+            "max_queue_depth": max(self.depth_samples, default=0),
+            "mean_queue_depth": round(statistics.fmean(self.depth_samples), 2) if self.depth_samples else 0.0
+        }
+        if not latencies:
+            return {**depth, "files": 0, "failed": self.failed, "transient_errors": self.transient_errors}
+        p95_index = min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))
+        return {
+            **depth,
+            "files": len(latencies),
+            "failed": self.failed,
+            "retried": self.retried,
+            "recovered": self.recovered,
+            "transient_errors": self.transient_errors,
+            "latency_mean": round(statistics.fmean(latencies), 4),
+            "latency_p95": round(latencies[p95_index], 4),
+            "latency_max": round(latencies[-1], 4)
+        }
@@ -0,0 +1,350 @@
+"""process_repository: incremental scrape of one repository"""
+import asyncio
+import atexit
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import time
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .analysis import _timed_analysis
+from .client import ScraperSession
+from .config import ScraperConfig, settings
+from .db import _age_seconds, get_db_writer, load_cached_analyses, load_repository_state, store_repository_results
+from .filters import PathFilter, _default_path_filter
+from .github import DownloadScheduler, download_archive, fetch_repo_tree, fetch_repository
+from .telemetry import metrics
+from .resources import ResourceMonitor
+
+logger = logging.getLogger(__name__)
+
+_analysis_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+def get_analysis_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Process-wide pool for CPU-bound AST analysis.
+
+    Workers come from a forkserver where available rather than being forked
+    from this process while the event loop, DB writer and to_thread workers run.
+    """
+    global _analysis_executor
+    if _analysis_executor is None:
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+        _analysis_executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max(1, ScraperConfig.ANALYSIS_WORKERS),
+            mp_context=multiprocessing.get_context(start_method)
+        )
+    return _analysis_executor
+
+def _replace_analysis_executor(
+    broken: concurrent.futures.ProcessPoolExecutor
+) -> concurrent.futures.ProcessPoolExecutor:
+    """Swap out a pool that lost a worker; every later submit to it would fail"""
+    global _analysis_executor
+    if _analysis_executor is broken:
+        logger.warning("Analysis pool is broken (a worker died), starting a new one")
+        _analysis_executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+    return get_analysis_executor()
+
+@atexit.register
+def _shutdown_analysis_executor():
+    if _analysis_executor is not None:
+        _analysis_executor.shutdown(cancel_futures=True)
+
+class AnalysisStage:
+    """Pipeline stage feeding downloaded files to the analysis process pool.
+
+    Files are submitted as soon as they are saved, so parsing overlaps with
+    the remaining downloads. Blobs with a cached analysis, or already
+    submitted under the same SHA, are not parsed again.
+    """
+
+    def __init__(
+        self,
+        cached: Dict[str, List[Dict[str, Any]]],
+        executor: Optional[concurrent.futures.Executor] = None,
+        monitor: Optional[ResourceMonitor] = None
+    ):
+        self.cached = cached
+        # None means the process-wide pool, which is replaced if it breaks
+        self.executor = executor
+        self.monitor = monitor
+        self.loop = asyncio.get_running_loop()
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.failed: Set[str] = set()
+
+    @staticmethod
+    def key(file_path: Path, blob_sha: Optional[str]) -> str:
+        return blob_sha or str(file_path)
+
+    def submit(self, file_path: Path, blob_sha: Optional[str]):
+        if file_path.suffix != ".py":
+            return
+        key = self.key(file_path, blob_sha)
+        if key not in self.cached and key not in self.pending:
+            self.pending[key] = self.loop.create_task(self._analyze(file_path))
+
+    async def _analyze(self, file_path: Path) -> List[Dict[str, Any]]:
+        if self.monitor is None:
+            functions, seconds = await self._run(file_path)
+        else:
+            async with self.monitor.slot():
+                functions, seconds = await self._run(file_path)
+        metrics.parse_seconds.observe(seconds)
+        return functions
+
+    async def _run(self, file_path: Path) -> Tuple[List[Dict[str, Any]], float]:
+        executor = self.executor or get_analysis_executor()
+        try:
+            return await self.loop.run_in_executor(executor, _timed_analysis, str(file_path))
+        except BrokenProcessPool:
+            if self.executor is not None:
+                raise
+            # Retried once on a fresh pool; a file that kills that one too fails
+            executor = _replace_analysis_executor(executor)
+            return await self.loop.run_in_executor(executor, _timed_analysis, str(file_path))
+
+    async def drain(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Wait for submitted files; returns fresh results keyed like ``key``.
+
+        Failed analyses are left out of the results and their keys added to
+        ``failed``, so they are never cached as "no functions".
+        """
+        keys = list(self.pending)
+        outcomes = await asyncio.gather(*self.pending.values(), return_exceptions=True)
+        results = {}
+        for key, outcome in zip(keys, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Analysis failed for {key}: {outcome!r}")
+                self.failed.add(key)
+            else:
+                results[key] = outcome
+        self.pending.clear()
+        return results
+
+async def process_repository(
+    owner: str,
+    repo: str,
+    file_extensions: List[str] = [".py"],
+    force_refresh: bool = False,
+    session: Optional[ScraperSession] = None,
+    fetch_mode: str = "auto",
+    path_filter: Optional[PathFilter] = None
+) -> Dict[str, Any]:
+    """Main function to process a repository.
+
+    Re-scrapes are incremental: blob SHAs from the tree are compared with
+    ``files.sha`` and only new or changed files are downloaded and analyzed,
+    while rows for removed paths are deleted. ``force_refresh`` ignores the
+    cache age and re-processes every file (blobs already in the store are
+    linked, not fetched).
+
+    ``fetch_mode`` is "files" (one request per file), "archive" (a single
+    tarball download) or "auto" (archive once more than
+    ScraperConfig.ARCHIVE_THRESHOLD files need downloading).
+
+    ``path_filter`` replaces the default filter built from
+    ``file_extensions`` and SKIP_PATTERNS, e.g. to add include/exclude globs.
+
+    The status is "partial" when some files could not be analyzed; they are
+    stored without a SHA, so the next scrape downloads and analyzes them again.
+    """
+    if fetch_mode not in ("auto", "files", "archive"):
+        raise ValueError(f"Unknown fetch mode: {fetch_mode}")
+    if session is None:
+        async with ScraperSession() as session:
+            return await process_repository(
+                owner, repo, file_extensions, force_refresh, session=session,
+                fetch_mode=fetch_mode, path_filter=path_filter
+            )
+    started = time.perf_counter()
+    with metrics.repo_span(owner, repo) as span:
+        result = await _process_repository(
+            owner, repo, file_extensions, force_refresh, session, fetch_mode, path_filter
+        )
+        if span is not None:
+            span.set_attributes({
+                key: value for key, value in result.items()
+                if isinstance(value, (str, int, float, bool))
+            })
+    metrics.repo_jobs.labels(result.get("status", "unknown")).inc()
+    metrics.repo_job_seconds.observe(time.perf_counter() - started)
+    return result
+
+async def _process_repository(
+    owner: str,
+    repo: str,
+    file_extensions: List[str],
+    force_refresh: bool,
+    session: ScraperSession,
+    fetch_mode: str,
+    path_filter: Optional[PathFilter]
+) -> Dict[str, Any]:
+    requests_before = session.request_count
+    reused_before = session.reused_connections
+
+    # Check if we need to refresh
+    repo_data, known_files = await asyncio.to_thread(load_repository_state, owner, repo)
+    
+    if repo_data and not force_refresh:
+        repo_id, scraped_at = repo_data[:2]
+        if _age_seconds(scraped_at) < (settings.max_cache_age_days * 86400):
+            logger.info(f"Repository {owner}/{repo} is up-to-date in cache")
+            return {"status": "cached"}
+    
+    # Fetch fresh data, unless a batch metadata fetch stored it since the last scrape
+    if (
+        repo_data and repo_data[2] and repo_data[3]
+        and (repo_data[1] is None or repo_data[3] > repo_data[1])
+        and _age_seconds(repo_data[3]) < ScraperConfig.METADATA_MAX_AGE_HOURS * 3600
+    ):
+        repo_info = json.loads(repo_data[2])
+    else:
+        repo_info = await fetch_repository(session, owner, repo)
+    if not repo_info:
+        return {"status": "failed", "error": "Could not fetch repo info"}
+    
+    # Prepare directory
+    save_dir = settings.repos_dir / owner / repo
+    save_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Get file tree
+    ref = repo_info.get("default_branch", "main")
+    path_filter = path_filter or _default_path_filter(tuple(file_extensions))
+    try:
+        tree = await fetch_repo_tree(
+            session, owner, repo, ref, path_filter=path_filter,
+            sparse=repo_info.get("size", 0) >= ScraperConfig.SPARSE_TREE_MIN_REPO_KB
+        )
+    except Exception as e:
+        return {"status": "failed", "error": str(e)}
+    
+    # Filter and download files
+    wanted = [item for item in tree if item["type"] == "blob" and path_filter(item["path"])]
+    # Oversized blobs are dropped by their tree size, before any request
+    oversized = [item["path"] for item in wanted if (item.get("size") or 0) > ScraperConfig.MAX_FILE_SIZE]
+    if oversized:
+        logger.info(f"{owner}/{repo}: skipping {len(oversized)} file(s) over {ScraperConfig.MAX_FILE_SIZE} bytes")
+        wanted = [item for item in wanted if (item.get("size") or 0) <= ScraperConfig.MAX_FILE_SIZE]
+    
+    blob_shas = {item["path"]: item.get("sha") for item in wanted}
+    changed = [
+        item for item in wanted
+        if force_refresh or item["path"] not in known_files
+        or known_files[item["path"]][1] is None
+        or known_files[item["path"]][1] != item.get("sha")
+    ]
+    removed = [path for path in known_files if path not in blob_shas]
+    logger.info(
+        f"{owner}/{repo}: {len(changed)} new/changed, "
+        f"{len(wanted) - len(changed)} unchanged, {len(removed)} removed"
+    )
+    
+    # Analysis runs in a process pool and starts as files arrive; results
+    # are cached per blob, so shared files are parsed once
+    cached_analyses = await asyncio.to_thread(load_cached_analyses, sorted({
+        item["sha"] for item in changed if item["path"].endswith(".py") and item.get("sha")
+    }))
+    analysis = AnalysisStage(cached_analyses, monitor=session.monitor)
+    
+    def analyze_when_saved(file_path: Path):
+        analysis.submit(file_path, blob_shas.get(file_path.relative_to(save_dir).as_posix()))
+    
+    # Blobs already in the content-addressed store (e.g. from a fork) need no request
+    blob_store = session.blob_store
+
+    def link_stored_blobs():
+        linked, missing = [], []
+        for item in changed:
+            if blob_store.has(item.get("sha")):
+                linked.append(blob_store.link(item["sha"], save_dir / item["path"]))
+            else:
+                missing.append(item)
+        return linked, missing
+
+    # Hardlinks/copies for every changed file: keep them off the event loop
+    linked, to_fetch = await asyncio.to_thread(link_stored_blobs)
+    blob_store.hits += len(linked)
+    for file_path in linked:
+        analyze_when_saved(file_path)
+    
+    if fetch_mode == "auto":
+        fetch_mode = "archive" if len(to_fetch) > ScraperConfig.ARCHIVE_THRESHOLD else "files"
+    scheduler = DownloadScheduler(session)
+    fetched = None
+    if fetch_mode == "archive" and to_fetch:
+        fetched = await download_archive(
+            session, owner, repo, ref, save_dir, file_extensions,
+            only_paths={item["path"] for item in to_fetch},
+            on_file=analyze_when_saved,
+            path_filter=path_filter
+        )
+        if fetched is None:
+            logger.warning(f"Falling back to per-file downloads for {owner}/{repo}")
+            fetch_mode = "files"
+    if fetched is None:
+        fetched = await scheduler.run(owner, repo, to_fetch, save_dir, on_file=analyze_when_saved)
+    successful_downloads = linked + fetched
+    
+    fresh_analyses = await analysis.drain()
+    file_rows = []
+    tree_shas = set(blob_shas.values())
+    new_analyses = [
+        (key, "python", json.dumps(functions))
+        for key, functions in fresh_analyses.items() if key in tree_shas
+    ]
+    total_functions = 0
+    analysis_failures = 0
+    for file_path in successful_downloads:
+        rel_path = file_path.relative_to(save_dir).as_posix()
+        blob_sha = blob_shas.get(rel_path)
+        if file_path.suffix != ".py":
+            # Recorded without analysis so the SHA check can skip it next time
+            file_rows.append((rel_path, blob_sha, None, []))
+            continue
+        
+        key = AnalysisStage.key(file_path, blob_sha)
+        if key in analysis.failed:
+            # A NULL sha makes the next run download and analyze it again
+            analysis_failures += 1
+            file_rows.append((rel_path, None, "python", []))
+            continue
+        functions = cached_analyses[key] if key in cached_analyses else fresh_analyses.get(key, [])
+        total_functions += len(functions)
+        file_rows.append((rel_path, blob_sha, "python", functions))
+    
+    # Drop local copies of files that disappeared from the tree
+    for path in removed:
+        (save_dir / path).unlink(missing_ok=True)
+    removed_file_ids = [known_files[path][0] for path in removed]
+    
+    # Store metadata through the shared writer thread
+    try:
+        repo_id = await get_db_writer().submit(
+            store_repository_results, owner, repo, repo_info, removed_file_ids, file_rows, new_analyses
+        )
+    except Exception as e:
+        logger.error(f"Database error: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+    
+    logger.info(f"Processed {len(successful_downloads)} files with {total_functions} functions")
+    if analysis_failures:
+        logger.warning(f"{owner}/{repo}: analysis failed for {analysis_failures} file(s)")
+    return {
+        "status": "partial" if analysis_failures else "success",
+        "fetch_mode": fetch_mode,
+        "downloaded_files": len(successful_downloads),
+        "blob_store_hits": len(linked),
+        "unchanged_files": len(wanted) - len(changed),
+        "removed_files": len(removed),
+        "oversized_files": len(oversized),
+        "analyzed_functions": total_functions,
+        "analysis_failures": analysis_failures,
+        "repo_id": repo_id,
+        "http_requests": session.request_count - requests_before,
+        "reused_connections": session.reused_connections - reused_before,
+        "downloads": scheduler.stats()
+    }
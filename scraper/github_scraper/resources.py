@@ -0,0 +1,141 @@
+"""Memory backpressure"""
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+import psutil
+
+from .config import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+class ResourceMonitor:
+    """Memory backpressure for the download and analysis stages.
+
+    Work is admitted through ``slot()``. A background loop samples memory as
+    a fraction of the usable limit (the cgroup limit inside containers): the
+    scraper's RSS including analysis workers, or system-wide usage,
+    whichever is higher. Crossing ``max_memory`` halves the number of slots;
+    once usage falls below ``max_memory - recovery_margin`` the limit is
+    doubled again until it is lifted.
+    """
+
+    CGROUP_LIMIT_FILES = ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes")
+
+    def __init__(
+        self,
+        max_memory: float = ScraperConfig.MEMORY_THRESHOLD,
+        recovery_margin: float = ScraperConfig.MEMORY_RECOVERY_MARGIN,
+        interval: float = ScraperConfig.MEMORY_CHECK_INTERVAL,
+        sampler: Optional[Callable[[], float]] = None
+    ):
+        self.max_memory = max_memory
+        self.recovery_margin = recovery_margin
+        self.interval = interval
+        self.process = psutil.Process(os.getpid())
+        self.sampler = sampler or self.memory_usage
+        self.limit: Optional[int] = None  # None: unthrottled
+        self.in_use = 0
+        self.throttle_events = 0
+        self._unthrottled_at = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def memory_limit(cls) -> int:
+        """Total memory, or the container's cgroup limit if lower"""
+        total = psutil.virtual_memory().total
+        for limit_file in cls.CGROUP_LIMIT_FILES:
+            try:
+                value = Path(limit_file).read_text().strip()
+            except OSError:
+                continue
+            if value.isdigit():
+                return min(total, int(value))
+        return total
+
+    def memory_usage(self) -> float:
+        """Fraction of the memory limit in use"""
+        rss = self.process.memory_info().rss
+        for child in self.process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return max(rss / self.memory_limit(), psutil.virtual_memory().percent / 100)
+
+    def sample(self) -> float:
+        """Take one memory sample and adjust the concurrency limit"""
+        usage = self.sampler()
+        if usage > self.max_memory:
+            if self.limit is None:
+                self._unthrottled_at = max(self.in_use, 2)
+            new_limit = max(1, (self.limit or self._unthrottled_at) // 2)
+            if new_limit != self.limit:
+                self.throttle_events += 1
+                logger.warning(f"High memory usage ({usage:.0%}), limiting work to {new_limit} slot(s)")
+            self.limit = new_limit
+        elif self.limit is not None and usage < self.max_memory - self.recovery_margin:
+            self.limit *= 2
+            if self.limit >= self._unthrottled_at:
+                self.limit = None
+                logger.info("Memory usage recovered, concurrency restored")
+            self._notify()
+        return usage
+
+    async def check_resources(self):
+        """Sample memory until cancelled"""
+        while True:
+            try:
+                self.sample()
+            except psutil.Error as e:
+                logger.error(f"Memory sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the sampling loop on the running event loop (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.check_resources())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _notify(self):
+        if self._condition is not None:
+            condition = self._condition
+            async def wake():
+                async with condition:
+                    condition.notify_all()
+            asyncio.get_running_loop().create_task(wake())
+
+    async def acquire(self):
+        """Wait until a slot is free under the current limit"""
+        self.start()
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.limit is None or self.in_use < self.limit)
+            self.in_use += 1
+
+    async def release(self):
+        self.in_use -= 1
+        async with self._condition:
+            self._condition.notify()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one unit of memory-gated work"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
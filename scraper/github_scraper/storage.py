@@ -0,0 +1,98 @@
+"""Content-addressed blob store for scraped sources"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .config import ScraperConfig, settings
+
+def write_atomic(path: Path, data: bytes):
+    """Write data to path through a temp file unique to this call"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+class BlobStore:
+    """Content-addressed store for scraped sources, keyed by git blob SHA.
+
+    Per-repo directories hold hardlinks into the store (copies where
+    hardlinks are unsupported), so identical files across forks and vendored
+    copies are stored and downloaded once.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or settings.blob_store_dir)
+        self.hits = 0
+
+    @staticmethod
+    def git_blob_sha(data: bytes) -> str:
+        """SHA-1 of the blob exactly as git computes it"""
+        return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+    def path_for(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha[2:]
+
+    def has(self, sha: Optional[str]) -> bool:
+        return bool(sha) and self.path_for(sha).exists()
+
+    def put(self, data: bytes) -> str:
+        """Store data if not already present and return its blob SHA"""
+        sha = self.git_blob_sha(data)
+        target = self.path_for(sha)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                write_atomic(target, data)
+            except OSError:
+                # Another thread or process stored the same blob first
+                if not target.exists():
+                    raise
+        return sha
+
+    def link(self, sha: str, dest: Path) -> Path:
+        """Materialize a stored blob at dest"""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(self.path_for(sha), dest)
+        except OSError:
+            shutil.copyfile(self.path_for(sha), dest)
+        return dest
+
+    def save(self, data: bytes, dest: Path) -> str:
+        """Store data and materialize it at dest; returns the blob SHA"""
+        sha = self.put(data)
+        self.link(sha, dest)
+        return sha
+
+    def temp_path(self) -> Path:
+        """A unique path inside the store for streaming a download into"""
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tmp_dir / f"{os.getpid()}-{threading.get_ident()}-{time.monotonic_ns()}.part"
+
+    def adopt(self, tmp_path: Path, dest: Path) -> str:
+        """Move a fully written temp file into the store and link it at dest"""
+        size = tmp_path.stat().st_size
+        sha1 = hashlib.sha1(b"blob %d\0" % size)
+        with open(tmp_path, "rb") as f:
+            for chunk in iter(lambda: f.read(ScraperConfig.DOWNLOAD_CHUNK_SIZE), b""):
+                sha1.update(chunk)
+        sha = sha1.hexdigest()
+        target = self.path_for(sha)
+        if target.exists():
+            tmp_path.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, target)
+        self.link(sha, dest)
+        return sha
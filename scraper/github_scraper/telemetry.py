@@ -0,0 +1,125 @@
+"""Prometheus metrics and OpenTelemetry spans for the scraper"""
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List
+
+try:
+    import prometheus_client
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+try:
+    from opentelemetry import trace as otel_trace
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class _NoopMetric:
+    """Stands in for prometheus metrics when prometheus-client is missing"""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def dec(self, amount: float = 1):
+        pass
+
+    def observe(self, amount: float):
+        pass
+
+    def set(self, value: float):
+        pass
+
+class ScraperMetrics:
+    """Prometheus counters and histograms for the scraper, plus repo-job spans.
+
+    Metrics live in their own registry. Read them with ``render()`` (text
+    exposition format), dump them with ``write(path)``, or serve them with
+    ``serve(port)``. Without prometheus-client every metric is a no-op.
+    If opentelemetry is installed and a tracer provider is configured,
+    each repository job gets a span from ``repo_span()``.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start again from zero in a fresh registry"""
+        self.registry = prometheus_client.CollectorRegistry() if PROMETHEUS_AVAILABLE else None
+        self.requests = self._metric(
+            "Counter", "scraper_http_requests_total", "GitHub HTTP requests", ["endpoint", "status"]
+        )
+        self.request_seconds = self._metric(
+            "Histogram", "scraper_http_request_seconds", "Time to response headers", ["endpoint"]
+        )
+        self.downloaded_bytes = self._metric(
+            "Counter", "scraper_downloaded_bytes_total", "Response body bytes received"
+        )
+        self.rate_limit_sleeps = self._metric(
+            "Counter", "scraper_rate_limit_sleeps_total", "Pauses forced by GitHub rate limits", ["reason"]
+        )
+        self.rate_limit_sleep_seconds = self._metric(
+            "Counter", "scraper_rate_limit_sleep_seconds_total", "Seconds spent waiting on rate limits"
+        )
+        self.queue_depth = self._metric(
+            "Gauge", "scraper_download_queue_depth", "Files waiting in download queues"
+        )
+        self.parse_seconds = self._metric(
+            "Histogram", "scraper_parse_seconds", "AST analysis time per file",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+        )
+        self.db_write_seconds = self._metric(
+            "Histogram", "scraper_db_write_seconds", "Duration of one batched write transaction"
+        )
+        self.repo_jobs = self._metric(
+            "Counter", "scraper_repo_jobs_total", "process_repository calls by outcome", ["status"]
+        )
+        self.repo_job_seconds = self._metric(
+            "Histogram", "scraper_repo_job_seconds", "process_repository wall time",
+            buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+        )
+        self.tracer = otel_trace.get_tracer(__name__) if OTEL_AVAILABLE else None
+
+    def _metric(self, kind: str, name: str, documentation: str, labels: List[str] = (), **kwargs):
+        if self.registry is None:
+            return _NoopMetric()
+        return getattr(prometheus_client, kind)(name, documentation, labels, registry=self.registry, **kwargs)
+
+    def render(self) -> str:
+        if self.registry is None:
+            return ""
+        return prometheus_client.generate_latest(self.registry).decode()
+
+    def write(self, path: Path):
+        """Atomically dump the current metrics in Prometheus text format"""
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, addr: str = "0.0.0.0"):
+        """Expose /metrics over HTTP from a background thread"""
+        if self.registry is None:
+            logger.warning("prometheus-client is not installed, metrics endpoint disabled")
+            return
+        prometheus_client.start_http_server(port, addr=addr, registry=self.registry)
+
+    @contextmanager
+    def repo_span(self, owner: str, repo: str):
+        """OpenTelemetry span for one repository job (None without opentelemetry)"""
+        if self.tracer is None:
+            yield None
+            return
+        with self.tracer.start_as_current_span(
+            "process_repository", attributes={"github.owner": owner, "github.repo": repo}
+        ) as span:
+            yield span
+
+metrics = ScraperMetrics()
@@ -0,0 +1,825 @@
+import os
+import json
+import asyncio
+import concurrent.futures
+import sys
+import io
+import sqlite3
+import shutil
+import subprocess
+import tarfile
+import threading
+import pytest
+import httpx
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+# Add the project root directory to sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("GITHUB_TOKEN", "test-token")
+
+from scraper import github_scraper as gs
+
+SAMPLE_SOURCE = '''
+def add(a: int, b: int) -> int:
+    """Adds two numbers."""
+    return a + b
+
+def _private():
+    pass
+'''
+
+def make_tarball(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for path, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(f"octo-demo-abc123/{path}")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+def make_handler(files):
+    """Build a MockTransport handler serving a tiny fake repository."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/rate_limit":
+            return httpx.Response(200, json={"resources": {"core": {"remaining": 5000, "limit": 5000, "reset": 0}}})
+        if path == "/repos/octo/demo":
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(
+                200,
+                json={"default_branch": "main", "language": "Python", "stargazers_count": 3},
+                headers={"ETag": '"v1"'}
+            )
+        if path.startswith("/repos/octo/demo/git/trees/"):
+            tree = [{"path": p, "type": "blob", "sha": gs.BlobStore.git_blob_sha(c.encode()), "size": len(c)} for p, c in files.items()]
+            return httpx.Response(200, json={"tree": tree, "truncated": False})
+        if path.startswith("/repos/octo/demo/contents/"):
+            file_path = path[len("/repos/octo/demo/contents/"):]
+            assert request.headers["Accept"] == "application/vnd.github.raw"
+            return httpx.Response(200, content=files[file_path].encode())
+        if path == "/graphql":
+            variables = json.loads(request.content)["variables"]
+            data = {}
+            for key, owner in variables.items():
+                if key.startswith("o"):
+                    name = variables["n" + key[1:]]
+                    data["r" + key[1:]] = None if name != "demo" else {
+                        "nameWithOwner": f"{owner}/{name}", "name": name, "owner": {"login": owner},
+                        "description": None, "isFork": False, "stargazerCount": 7, "forkCount": 1,
+                        "pushedAt": None, "updatedAt": None,
+                        "primaryLanguage": {"name": "Python"}, "defaultBranchRef": {"name": "main"}
+                    }
+            return httpx.Response(200, json={"data": data})
+        if path == "/repos/octo/demo/tarball/main":
+            return httpx.Response(200, content=make_tarball(files))
+        return httpx.Response(404)
+    return handler
+
+@pytest.fixture
+def scraper_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(gs.settings, "db_file", str(tmp_path / "scraped.db"))
+    monkeypatch.setattr(gs.settings, "repos_dir", tmp_path / "repos")
+    monkeypatch.setattr(gs.settings, "blob_store_dir", tmp_path / "blobs")
+    monkeypatch.setattr(gs.settings, "http_cache_dir", tmp_path / "http_cache")
+    gs.init_db()
+    return tmp_path
+
+@pytest.mark.asyncio
+async def test_session_counts_requests():
+    transport = httpx.MockTransport(make_handler({}))
+    async with gs.ScraperSession(transport=transport) as session:
+        await gs.check_rate_limit(session)
+        await gs.check_rate_limit(session)
+        assert session.stats()["requests"] == 2
+
+@pytest.mark.asyncio
+async def test_process_repository_with_shared_session(scraper_env):
+    files = {"pkg/math_utils.py": SAMPLE_SOURCE, "tests/test_math.py": SAMPLE_SOURCE}
+    transport = httpx.MockTransport(make_handler(files))
+    async with gs.ScraperSession(transport=transport) as session:
+        result = await gs.process_repository("octo", "demo", session=session)
+
+    assert result["status"] == "success"
+    assert result["downloaded_files"] == 1  # tests/ is skipped
+    assert result["http_requests"] > 0
+    assert "reused_connections" in result
+    assert result["downloads"]["files"] == 1
+
+    conn = sqlite3.connect(gs.settings.db_file)
+    names = [row[0] for row in conn.execute("SELECT name FROM functions")]
+    conn.close()
+    assert names == ["add"]
+
+def test_scheduler_priority_prefers_small_public_files():
+    items = [
+        {"path": "pkg/_internal.py", "size": 10},
+        {"path": "pkg/big.py", "size": 5000},
+        {"path": "pkg/small.py", "size": 50},
+    ]
+    ordered = sorted(items, key=gs.DownloadScheduler.priority)
+    assert [item["path"] for item in ordered] == ["pkg/small.py", "pkg/big.py", "pkg/_internal.py"]
+
+@pytest.mark.asyncio
+async def test_governor_tracks_headers_and_honours_retry_after():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={}, headers={
+            "X-RateLimit-Resource": "core",
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "41",
+            "X-RateLimit-Reset": "9999999999",
+        })
+
+    governor = gs.RateLimitGovernor()
+    tokens = gs.TokenPool(["t1"], {"t1": governor})
+    async with gs.ScraperSession(transport=httpx.MockTransport(handler), tokens=tokens) as session:
+        response = await gs.fetch_repository(session, "octo", "demo")
+
+    assert response == {}
+    assert calls == ["/repos/octo/demo", "/repos/octo/demo"]  # no /rate_limit round-trips
+    assert governor.budgets["core"].remaining == 41
+
+@pytest.mark.asyncio
+async def test_process_repository_archive_mode(scraper_env):
+    files = {"pkg/a.py": SAMPLE_SOURCE, "pkg/b.py": SAMPLE_SOURCE, "docs/conf.py": SAMPLE_SOURCE}
+    transport = httpx.MockTransport(make_handler(files))
+    async with gs.ScraperSession(transport=transport) as session:
+        result = await gs.process_repository("octo", "demo", session=session, fetch_mode="archive")
+
+    assert result["status"] == "success"
+    assert result["fetch_mode"] == "archive"
+    assert result["downloaded_files"] == 2  # docs/ is skipped while extracting
+    assert result["http_requests"] == 3  # repo info, tree, tarball
+    assert (scraper_env / "repos" / "octo" / "demo" / "pkg" / "a.py").exists()
+
+
+@pytest.mark.asyncio
+async def test_archive_extraction_keeps_event_loop_responsive(scraper_env):
+    files = {"pkg/a.py": SAMPLE_SOURCE, "pkg/b.py": SAMPLE_SOURCE}
+    loop_thread = threading.get_ident()
+    released = threading.Event()
+    callback_threads = []
+
+    async with gs.ScraperSession(transport=httpx.MockTransport(make_handler(files))) as session:
+        save = session.blob_store.save
+
+        def blocking_save(data, dest):
+            # Only returns if the loop keeps running while we extract
+            assert released.wait(timeout=5)
+            return save(data, dest)
+
+        session.blob_store.save = blocking_save
+
+        async def release():
+            await asyncio.sleep(0.05)
+            released.set()
+
+        saved, _ = await asyncio.gather(
+            gs.download_archive(
+                session, "octo", "demo", "main", scraper_env / "repos" / "demo", [".py"],
+                on_file=lambda path: callback_threads.append(threading.get_ident())
+            ),
+            release()
+        )
+
+    assert sorted(path.name for path in saved) == ["a.py", "b.py"]
+    assert callback_threads == [loop_thread, loop_thread]
+
+@pytest.mark.asyncio
+async def test_rescrape_only_fetches_changed_blobs(scraper_env, monkeypatch):
+    files = {"pkg/a.py": SAMPLE_SOURCE, "pkg/b.py": SAMPLE_SOURCE, "pkg/c.py": SAMPLE_SOURCE}
+    transport = httpx.MockTransport(make_handler(files))
+    async with gs.ScraperSession(transport=transport) as session:
+        await gs.process_repository("octo", "demo", session=session)
+
+        # Cache expires; one file changes, one is removed, one is added
+        monkeypatch.setattr(gs.settings, "max_cache_age_days", 0)
+        files["pkg/a.py"] = SAMPLE_SOURCE + "\ndef sub(a, b):\n    return a - b\n"
+        del files["pkg/b.py"]
+        files["pkg/d.py"] = SAMPLE_SOURCE
+        result = await gs.process_repository("octo", "demo", session=session)
+
+    assert result["downloaded_files"] == 2
+    assert result["unchanged_files"] == 1
+    assert result["removed_files"] == 1
+    assert result["blob_store_hits"] == 1  # d.py has the same content as c.py
+    assert result["http_requests"] == 3  # repo info, tree, changed a.py
+
+    conn = sqlite3.connect(gs.settings.db_file)
+    paths = sorted(row[0] for row in conn.execute("SELECT path FROM files"))
+    function_count = conn.execute("SELECT COUNT(*) FROM functions").fetchone()[0]
+    conn.close()
+    assert paths == ["pkg/a.py", "pkg/c.py", "pkg/d.py"]
+    assert function_count == 4  # add+sub in a.py, add in c.py and d.py
+
+def test_blob_store_put_is_safe_across_threads(tmp_path, monkeypatch):
+    store = gs.BlobStore(tmp_path / "blobs")
+    data = b"same blob from two forks"
+    # Every thread finishes writing before any of them moves its file into place
+    replace, replace_barrier = os.replace, threading.Barrier(8)
+
+    def synchronized_replace(src, dst):
+        replace_barrier.wait()
+        replace(src, dst)
+
+    monkeypatch.setattr(gs.storage.os, "replace", synchronized_replace)
+    barrier = threading.Barrier(8)
+
+    def put():
+        barrier.wait()
+        return store.put(data)
+
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        shas = set(pool.map(lambda _: put(), range(8)))
+
+    assert shas == {gs.BlobStore.git_blob_sha(data)}
+    assert store.path_for(shas.pop()).read_bytes() == data
+    assert not list(store.root.rglob("*.tmp"))
+
+@pytest.mark.asyncio
+async def test_forks_share_blobs_and_analysis(scraper_env):
+    files = {"pkg/a.py": SAMPLE_SOURCE}
+
+    def handler(request):
+        # Serve the same content under two repository names
+        request.url = request.url.copy_with(path=request.url.path.replace("/octo/fork", "/octo/demo"))
+        return make_handler(files)(request)
+
+    async with gs.ScraperSession(transport=httpx.MockTransport(handler)) as session:
+        await gs.process_repository("octo", "demo", session=session)
+        result = await gs.process_repository("octo", "fork", session=session)
+
+    assert result["blob_store_hits"] == 1
+    assert result["http_requests"] == 2  # repo info and tree only
+    original = scraper_env / "repos" / "octo" / "demo" / "pkg" / "a.py"
+    forked = scraper_env / "repos" / "octo" / "fork" / "pkg" / "a.py"
+    assert original.read_text() == forked.read_text()
+    assert os.path.samefile(original, forked)
+
+    conn = sqlite3.connect(gs.settings.db_file)
+    assert conn.execute("SELECT COUNT(*) FROM blob_analysis").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM functions").fetchone()[0] == 2
+    conn.close()
+
+@pytest.mark.asyncio
+async def test_db_writer_batches_concurrent_jobs(scraper_env):
+    def insert_repo(conn, name):
+        conn.execute("INSERT INTO repositories (owner, name) VALUES (?, ?)", ("octo", name))
+        return name
+
+    def broken(conn):
+        conn.execute("INSERT INTO repositories (owner, name) VALUES ('octo', 'x')")
+        raise RuntimeError("boom")
+
+    writer = gs.DatabaseWriter(gs.settings.db_file)
+    jobs = [writer.submit(insert_repo, f"repo{i}") for i in range(10)] + [writer.submit(broken)]
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    writer.close()
+
+    assert results[:10] == [f"repo{i}" for i in range(10)]
+    assert isinstance(results[10], RuntimeError)
+    conn = sqlite3.connect(gs.settings.db_file)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    names = {row[0] for row in conn.execute("SELECT name FROM repositories")}
+    conn.close()
+    assert names == {f"repo{i}" for i in range(10)}  # the failed job was rolled back alone
+
+def test_init_db_migrates_legacy_schema(tmp_path, monkeypatch):
+    db_file = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_file)
+    gs.db._schema_v1(conn)
+    conn.execute("INSERT INTO repositories (owner, name) VALUES ('octo', 'demo')")
+    conn.execute("INSERT INTO files (repo_id, path) VALUES (1, 'a.py')")
+    conn.execute("INSERT INTO functions (file_id, name) VALUES (1, 'add')")
+    conn.execute("INSERT INTO functions (file_id, name) VALUES (99, 'orphan')")
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(gs.settings, "db_file", str(db_file))
+    gs.init_db()
+    gs.init_db()  # idempotent
+
+    conn = gs.connect_db()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == gs.SCHEMA_VERSION
+    assert conn.execute("SELECT name FROM functions").fetchall() == [("add",)]
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT file_id FROM functions WHERE name = 'add'").fetchall()
+    assert "idx_functions_name" in plan[0][-1]
+    conn.execute("DELETE FROM repositories")
+    assert conn.execute("SELECT COUNT(*) FROM functions").fetchone()[0] == 0  # cascaded
+    conn.close()
+
+@pytest.mark.asyncio
+async def test_file_ids_stay_stable_across_refresh(scraper_env, monkeypatch):
+    files = {"pkg/a.py": SAMPLE_SOURCE}
+    transport = httpx.MockTransport(make_handler(files))
+    async with gs.ScraperSession(transport=transport) as session:
+        await gs.process_repository("octo", "demo", session=session)
+        conn = sqlite3.connect(gs.settings.db_file)
+        first_id = conn.execute("SELECT id FROM files").fetchone()[0]
+
+        monkeypatch.setattr(gs.settings, "max_cache_age_days", 0)
+        files["pkg/a.py"] = SAMPLE_SOURCE + "\ndef sub(a, b):\n    return a - b\n"
+        await gs.process_repository("octo", "demo", session=session)
+
+    assert conn.execute("SELECT id FROM files").fetchall() == [(first_id,)]
+    names = sorted(row[0] for row in conn.execute("SELECT name FROM functions WHERE file_id = ?", (first_id,)))
+    conn.close()
+    assert names == ["add", "sub"]
+
+@pytest.mark.asyncio
+async def test_search_functions_stays_in_sync(scraper_env, monkeypatch):
+    files = {
+        "pkg/a.py": SAMPLE_SOURCE,
+        "pkg/text.py": 'def slugify(title: str) -> str:\n    """Make a URL slug from a title."""\n    return title.lower()\n',
+    }
+    transport = httpx.MockTransport(make_handler(files))
+    async with gs.ScraperSession(transport=transport) as session:
+        await gs.process_repository("octo", "demo", session=session)
+
+        hits = gs.search_functions("url slug", language="python", repo="octo/demo")
+        assert [hit["name"] for hit in hits] == ["slugify"]
+        assert gs.search_functions("numbers", min_stars=100) == []
+
+        # Removing the file drops its functions from the index
+        monkeypatch.setattr(gs.settings, "max_cache_age_days", 0)
+        del files["pkg/text.py"]
+        await gs.process_repository("octo", "demo", session=session)
+
+    assert gs.search_functions("slug") == []
+    assert [hit["name"] for hit in gs.search_functions("adds two numbers")] == ["add"]
+
+@pytest.mark.asyncio
+async def test_crawl_engine_resumes_and_skips_completed(scraper_env):
+    transport = httpx.MockTransport(make_handler({"pkg/a.py": SAMPLE_SOURCE}))
+    async with gs.ScraperSession(transport=transport) as session:
+        engine = gs.CrawlEngine(session, concurrency=2)
+        assert await engine.enqueue(["octo/demo", "octo/missing"]) == 2
+        assert await engine.enqueue(["octo/demo"]) == 0  # already queued
+
+        counts = await engine.run()
+        assert counts == {"done": 1, "failed": 1}
+        assert engine.processed == 1 + gs.ScraperConfig.MAX_RETRIES
+
+        # A job left running by a crashed process is picked up again
+        conn = sqlite3.connect(gs.settings.db_file)
+        conn.execute("UPDATE crawl_jobs SET status = 'running' WHERE name = 'demo'")
+        conn.commit()
+        conn.close()
+        resumed = gs.CrawlEngine(session)
+        assert await resumed.run() == {"done": 1, "failed": 1}
+        assert resumed.processed == 1
+
+@pytest.mark.asyncio
+async def test_conditional_requests_replay_cached_body(scraper_env):
+    governor = gs.RateLimitGovernor()
+    governor.seed("core", gs.RateLimitStatus(remaining=10, limit=10, reset_time=9999999999))
+    transport = httpx.MockTransport(make_handler({}))
+    tokens = gs.TokenPool(["t1"], {"t1": governor})
+    async with gs.ScraperSession(transport=transport, tokens=tokens) as session:
+        first = await gs.fetch_repository(session, "octo", "demo")
+        second = await gs.fetch_repository(session, "octo", "demo")
+
+        assert first == second
+        assert session.stats()["not_modified"] == 1
+        assert governor.budgets["core"].remaining == 9  # the 304 was not charged
+
+@pytest.mark.asyncio
+async def test_token_pool_prefers_budget_and_sets_aside_throttled_tokens():
+    used = []
+
+    def handler(request):
+        token = request.headers["Authorization"].split()[-1]
+        used.append(token)
+        if token == "t2":
+            return httpx.Response(403, text="You have exceeded a secondary rate limit")
+        return httpx.Response(200, json={}, headers={
+            "X-RateLimit-Remaining": "100", "X-RateLimit-Reset": "9999999999"
+        })
+
+    tokens = gs.TokenPool(["t1", "t2", "t3"])
+    tokens.governor("t1").seed("core", gs.RateLimitStatus(remaining=0, limit=5000, reset_time=9999999999))
+    tokens.governor("t3").seed("core", gs.RateLimitStatus(remaining=10, limit=5000, reset_time=9999999999))
+    async with gs.ScraperSession(transport=httpx.MockTransport(handler), tokens=tokens) as session:
+        response = await gs.fetch_repository(session, "octo", "demo")
+
+    assert response == {}
+    # t1 is exhausted, t2 (unknown budget) is tried first and set aside, t3 serves the request
+    assert used == ["t2", "t3"]
+    assert tokens.governor("t2").available_at("core") > 0
+
+@pytest.mark.asyncio
+async def test_streamed_download_survives_secondary_rate_limit(scraper_env):
+    used = []
+
+    def handler(request):
+        token = request.headers["Authorization"].split()[-1]
+        used.append(token)
+        if token == "t1":
+            return httpx.Response(403, content=body(b"You have exceeded a secondary rate limit"))
+        return httpx.Response(200, content=body(SAMPLE_SOURCE.encode()))
+
+    async def body(data):
+        # A real stream, so nothing is read before the client asks
+        yield data
+
+    tokens = gs.TokenPool(["t1", "t2"])
+    tokens.governor("t2").seed("core", gs.RateLimitStatus(remaining=10, limit=5000, reset_time=9999999999))
+    async with gs.ScraperSession(transport=httpx.MockTransport(handler), tokens=tokens) as session:
+        saved = await gs.download_file(session, "octo", "demo", "pkg/a.py", scraper_env / "repos" / "demo")
+
+    assert saved is not None and saved.read_text() == SAMPLE_SOURCE
+    assert used == ["t1", "t2"]  # the 403 was recognised as throttling, not a missing file
+    assert tokens.governor("t1").available_at("core") > 0
+
+@pytest.mark.asyncio
+async def test_batch_metadata_skips_fetch_repository(scraper_env):
+    files = {"pkg/a.py": SAMPLE_SOURCE}
+    requests = []
+    handler = make_handler(files)
+    def recording_handler(request):
+        requests.append(request.url.path)
+        return handler(request)
+
+    async with gs.ScraperSession(transport=httpx.MockTransport(recording_handler)) as session:
+        fetched = await gs.fetch_repositories_batch(session, ["octo/demo", "octo/missing"], batch_size=1)
+        assert list(fetched) == ["octo/demo"]
+        assert fetched["octo/demo"]["stargazers_count"] == 7
+
+        # Metadata alone does not count as a scraped repository
+        conn = sqlite3.connect(gs.settings.db_file)
+        assert conn.execute("SELECT stars, scraped_at FROM repositories").fetchone() == (7, None)
+        conn.close()
+
+        result = await gs.process_repository("octo", "demo", session=session)
+
+    assert result["status"] == "success"
+    assert requests.count("/graphql") == 2
+    assert "/repos/octo/demo" not in requests
+
+@pytest.mark.asyncio
+async def test_oversized_files_skipped_and_aborted(scraper_env, monkeypatch):
+    monkeypatch.setattr(gs.ScraperConfig, "MAX_FILE_SIZE", len(SAMPLE_SOURCE))
+    monkeypatch.setattr(gs.ScraperConfig, "DOWNLOAD_CHUNK_SIZE", 16)
+    files = {"pkg/a.py": SAMPLE_SOURCE, "pkg/big.py": SAMPLE_SOURCE * 10}
+    transport = httpx.MockTransport(make_handler(files))
+    async with gs.ScraperSession(transport=transport) as session:
+        result = await gs.process_repository("octo", "demo", session=session)
+
+        assert result["downloaded_files"] == 1
+        assert result["oversized_files"] == 1
+        assert result["http_requests"] == 3  # repo info, tree, a.py; big.py never requested
+
+        # A body larger than its advertised size is aborted mid-stream
+        saved = await gs.download_file(session, "octo", "demo", "pkg/big.py", scraper_env / "out", size=10)
+    assert saved is None
+    assert not (scraper_env / "out" / "pkg" / "big.py").exists()
+    assert list((scraper_env / "blobs" / "tmp").iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_resource_monitor_shrinks_and_restores_concurrency():
+    usage = [0.5]
+    monitor = gs.ResourceMonitor(max_memory=0.8, recovery_margin=0.1, sampler=lambda: usage[0])
+    monitor.start = lambda: None  # samples are taken by hand below
+
+    for _ in range(4):
+        await monitor.acquire()
+    usage[0] = 0.9
+    monitor.sample()
+    assert monitor.limit == 2
+
+    blocked = asyncio.ensure_future(monitor.acquire())
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    for _ in range(3):
+        await monitor.release()
+    await asyncio.sleep(0)
+    assert blocked.done() and monitor.in_use == 2
+
+    usage[0] = 0.75  # inside the hysteresis band: no change
+    monitor.sample()
+    assert monitor.limit == 2
+    usage[0] = 0.5
+    monitor.sample()
+    assert monitor.limit is None
+    assert monitor.throttle_events == 1
+
+def test_path_filter_matches_legacy_rules_and_globs():
+    default = gs.PathFilter([".py", ".d.ts"])
+    assert default("pkg/a.py") and default("types/index.d.ts")
+    assert not default("pkg/a.pyc") and not default("node_modules/x.py") and not default("tests/test_a.py")
+
+    globs = gs.PathFilter(
+        [".py"], skip_patterns=set(),
+        include=["src/", "/tools/*.py"],
+        exclude=["generated/", "*_pb2.py", "!src/keep_pb2.py"]
+    )
+    assert globs("src/app/models.py")
+    assert globs("tools/run.py") and not globs("lib/tools/run.py")  # anchored to the root
+    assert not globs("src/generated/api.py")  # directory excluded at any depth
+    assert not globs("src/api_pb2.py") and globs("src/keep_pb2.py")
+    assert not globs("lib/models.py")  # not included
+
+@pytest.mark.asyncio
+async def test_truncated_tree_is_walked_with_pruning(scraper_env):
+    subtrees = {
+        "root": [
+            {"path": "setup.py", "type": "blob", "sha": "b1", "size": 10},
+            {"path": "pkg", "type": "tree", "sha": "t-pkg"},
+            {"path": "node_modules", "type": "tree", "sha": "t-nm"},
+        ],
+        "t-pkg": [
+            {"path": "a.py", "type": "blob", "sha": "b2", "size": 10},
+            {"path": "sub", "type": "tree", "sha": "t-sub"},
+        ],
+        "t-sub": [{"path": "b.py", "type": "blob", "sha": "b3", "size": 10}],
+    }
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        ref = request.url.path.rsplit("/", 1)[-1]
+        if ref == "main":
+            return httpx.Response(200, json={"sha": "root", "tree": [], "truncated": True})
+        return httpx.Response(200, json={"sha": ref, "tree": subtrees[ref], "truncated": False})
+
+    async with gs.ScraperSession(transport=httpx.MockTransport(handler)) as session:
+        tree = await gs.fetch_repo_tree(session, "octo", "huge", "main", path_filter=gs.PathFilter([".py"]))
+
+    paths = {item["path"] for item in tree if item["type"] == "blob"}
+    assert paths == {"setup.py", "pkg/a.py", "pkg/sub/b.py"}
+    assert not any(url.endswith("/t-nm") for url in requested)  # pruned, never listed
+    assert len(requested) == 4  # truncated recursive listing, root, pkg, pkg/sub
+
+@pytest.mark.asyncio
+async def test_walk_tree_reports_malformed_listings_instead_of_hanging(scraper_env):
+    def handler(request):
+        sha = request.url.path.rsplit("/", 1)[-1]
+        if sha == "t-bad":
+            return httpx.Response(200, json={"tree": [{"type": "blob"}]})  # no "path"
+        return httpx.Response(200, json={"tree": [{"path": "ok.py", "type": "blob", "sha": "b1"}]})
+
+    root = [
+        {"path": "bad", "type": "tree", "sha": "t-bad"},
+        {"path": "good", "type": "tree", "sha": "t-good"},
+    ]
+    async with gs.ScraperSession(transport=httpx.MockTransport(handler)) as session:
+        with pytest.raises(ValueError, match="Failed to walk tree"):
+            await asyncio.wait_for(gs.walk_tree(session, "octo", "demo", root, concurrency=1), timeout=5)
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_not_lost(scraper_env):
+    files = {"pkg/a.py": SAMPLE_SOURCE, "pkg/b.py": SAMPLE_SOURCE + "\n# b\n"}
+    handler = make_handler(files)
+    flaky = {"pkg/a.py": 2, "pkg/b.py": 5}  # b.py outlasts the in-request retries
+
+    def flaky_handler(request):
+        path = request.url.path.partition("/contents/")[2]
+        if flaky.get(path):
+            flaky[path] -= 1
+            return httpx.Response(502)
+        return handler(request)
+
+    policy = gs.RetryPolicy(max_retries=2, base_delay=0)
+    async with gs.ScraperSession(transport=httpx.MockTransport(flaky_handler), retry_policy=policy) as session:
+        result = await gs.process_repository("octo", "demo", session=session)
+
+    assert result["downloaded_files"] == 2
+    assert result["downloads"]["failed"] == 0
+    assert result["downloads"]["recovered"] == 1  # b.py, from the end-of-job retry queue
+    assert result["downloads"]["files"] == 2  # one latency per file, not per attempt
+    assert result["downloads"]["transient_errors"] == 1
+
+@pytest.mark.asyncio
+async def test_download_scheduler_samples_queue_depth(scraper_env):
+    files = {f"pkg/m{i}.py": SAMPLE_SOURCE + f"# {i}\n" for i in range(3)}
+    items = [{"path": path, "sha": f"s{i}", "size": 10} for i, path in enumerate(files)]
+    async with gs.ScraperSession(transport=httpx.MockTransport(make_handler(files))) as session:
+        scheduler = gs.DownloadScheduler(session, workers=1)
+        saved = await scheduler.run("octo", "demo", items, scraper_env / "repos" / "demo")
+
+    assert len(saved) == 3
+    assert scheduler.depth_samples == [2, 1, 0]  # files still waiting as each one is taken
+    stats = scheduler.stats()
+    assert (stats["max_queue_depth"], stats["mean_queue_depth"]) == (2, 1.0)
+
+def test_circuit_breaker_opens_and_half_opens(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(gs.client.time, "monotonic", lambda: now[0])
+    breaker = gs.CircuitBreaker(failure_threshold=2, cooldown=10)
+    breaker.record_failure()
+    breaker.check("x")
+    breaker.record_failure()
+    with pytest.raises(gs.CircuitOpenError):
+        breaker.check("x")
+
+    now[0] += 10
+    breaker.check("x")  # the single half-open trial
+    with pytest.raises(gs.CircuitOpenError):
+        breaker.check("x")
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert gs.CircuitBreaker.endpoint_for("https://api.github.com/repos/a/b/contents/x.py") == "api.github.com/repos/*/*/contents"
+
+class RecordingExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Thread pool standing in for the analysis process pool; records submissions."""
+
+    def __init__(self, on_submit=None):
+        super().__init__(max_workers=2)
+        self.submitted = []
+        self.on_submit = on_submit
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(args[0])
+        if self.on_submit:
+            self.on_submit()
+        return super().submit(fn, *args, **kwargs)
+
+@pytest.mark.asyncio
+async def test_analysis_starts_before_downloads_finish(scraper_env, monkeypatch):
+    files = {"pkg/a.py": SAMPLE_SOURCE, "pkg/b.py": SAMPLE_SOURCE + "\n# larger, so fetched second\n"}
+    handler = make_handler(files)
+    events = []
+    analysis_started = asyncio.Event()
+
+    def started():
+        events.append("analysis")
+        analysis_started.set()
+
+    async def gated_handler(request):
+        if request.url.path.endswith("/contents/pkg/b.py"):
+            # b.py is only served once analysis of a.py is under way
+            await asyncio.wait_for(analysis_started.wait(), timeout=5)
+            events.append("b.py served")
+        return handler(request)
+
+    executor = RecordingExecutor(on_submit=started)
+    monkeypatch.setattr(gs.pipeline, "get_analysis_executor", lambda: executor)
+    try:
+        async with gs.ScraperSession(transport=httpx.MockTransport(gated_handler)) as session:
+            result = await gs.process_repository("octo", "demo", session=session, fetch_mode="files")
+    finally:
+        executor.shutdown()
+
+    assert result["status"] == "success"
+    assert result["downloaded_files"] == 2
+    assert events[:2] == ["analysis", "b.py served"]
+
+@pytest.mark.asyncio
+async def test_analysis_stage_skips_cached_and_pending_shas(tmp_path):
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text(SAMPLE_SOURCE)
+    (tmp_path / "notes.txt").write_text("not python")
+    executor = RecordingExecutor()
+    try:
+        stage = gs.AnalysisStage({"sha-cached": [{"name": "old"}]}, executor=executor)
+        stage.submit(tmp_path / "a.py", "sha-cached")
+        stage.submit(tmp_path / "b.py", "sha-new")
+        stage.submit(tmp_path / "c.py", "sha-new")  # same blob under another path
+        stage.submit(tmp_path / "notes.txt", "sha-txt")
+        results = await stage.drain()
+    finally:
+        executor.shutdown()
+
+    assert executor.submitted == [str(tmp_path / "b.py")]
+    assert list(results) == ["sha-new"]
+    assert [f["name"] for f in results["sha-new"]] == ["add"]
+
+@pytest.mark.asyncio
+async def test_analysis_stage_drain_leaves_failures_out(tmp_path, caplog):
+    (tmp_path / "good.py").write_text(SAMPLE_SOURCE)
+    executor = RecordingExecutor()
+    try:
+        stage = gs.AnalysisStage({}, executor=executor)
+        stage.submit(tmp_path / "good.py", "sha-good")
+        stage.submit(tmp_path / "missing.py", "sha-missing")  # reading it raises in the worker
+        with caplog.at_level("ERROR", logger=gs.pipeline.__name__):
+            results = await stage.drain()
+    finally:
+        executor.shutdown()
+
+    assert list(results) == ["sha-good"]
+    assert [f["name"] for f in results["sha-good"]] == ["add"]
+    assert stage.failed == {"sha-missing"}
+    assert "Analysis failed for sha-missing" in caplog.text
+    assert stage.pending == {}
+
+class FailingOnceExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Executor whose first task fails, as on a read error in the worker"""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.failures = 1
+
+    def submit(self, fn, *args, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            future = concurrent.futures.Future()
+            future.set_exception(OSError("read error"))
+            return future
+        return super().submit(fn, *args, **kwargs)
+
+@pytest.mark.asyncio
+async def test_failed_analysis_is_not_cached(scraper_env, monkeypatch):
+    files = {"pkg/a.py": SAMPLE_SOURCE}
+    executor = FailingOnceExecutor()
+    monkeypatch.setattr(gs.pipeline, "get_analysis_executor", lambda: executor)
+    try:
+        async with gs.ScraperSession(transport=httpx.MockTransport(make_handler(files))) as session:
+            failed = await gs.process_repository("octo", "demo", session=session)
+            conn = sqlite3.connect(gs.settings.db_file)
+            cached = conn.execute("SELECT COUNT(*) FROM blob_analysis").fetchone()[0]
+            stored_sha = conn.execute("SELECT sha FROM files WHERE path = 'pkg/a.py'").fetchone()[0]
+            conn.close()
+            retried = await gs.process_repository("octo", "demo", session=session, force_refresh=True)
+    finally:
+        executor.shutdown()
+
+    assert (failed["status"], failed["analysis_failures"], failed["analyzed_functions"]) == ("partial", 1, 0)
+    assert cached == 0
+    assert stored_sha is None  # re-downloaded and re-analyzed next run
+    assert (retried["status"], retried["analysis_failures"], retried["analyzed_functions"]) == ("success", 0, 1)
+
+@pytest.mark.asyncio
+async def test_broken_analysis_pool_is_replaced(tmp_path, monkeypatch):
+    (tmp_path / "good.py").write_text(SAMPLE_SOURCE)
+    broken = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()  # a worker dies, as in an OOM kill
+    monkeypatch.setattr(gs.pipeline, "_analysis_executor", broken)
+    try:
+        stage = gs.AnalysisStage({})
+        stage.submit(tmp_path / "good.py", "sha-good")
+        results = await stage.drain()
+        replacement = gs.pipeline._analysis_executor
+    finally:
+        if gs.pipeline._analysis_executor not in (None, broken):
+            gs.pipeline._analysis_executor.shutdown()
+
+    assert replacement is not broken
+    assert stage.failed == set()
+    assert [f["name"] for f in results["sha-good"]] == ["add"]
+
+@pytest.mark.asyncio
+async def test_metrics_cover_requests_bytes_parse_and_db(scraper_env, monkeypatch):
+    gs.metrics.reset()
+    files = {"pkg/a.py": SAMPLE_SOURCE}
+    async with gs.ScraperSession(transport=httpx.MockTransport(make_handler(files))) as session:
+        await gs.process_repository("octo", "demo", session=session)
+
+    text = gs.metrics.render()
+    assert 'scraper_http_requests_total{endpoint="api.github.com/repos/*/*/contents",status="200"} 1.0' in text
+    downloaded = float(text.split("\nscraper_downloaded_bytes_total ")[1].split()[0])
+    assert downloaded > len(SAMPLE_SOURCE)  # the file plus repo and tree JSON
+    assert 'scraper_parse_seconds_count 1.0' in text
+    assert 'scraper_repo_jobs_total{status="success"} 1.0' in text
+    assert 'scraper_db_write_seconds_count' in text
+    assert 'scraper_download_queue_depth 0.0' in text
+
+    gs.metrics.write(scraper_env / "metrics.prom")
+    assert (scraper_env / "metrics.prom").read_text() == text
+
+@pytest.mark.asyncio
+async def test_fake_github_record_and_replay(scraper_env, tmp_path):
+    from scraper.fake_github import FakeGitHub, synthetic_repo
+
+    fake = FakeGitHub([synthetic_repo("bench", "small", 5)])
+    fixture = tmp_path / "fixture.jsonl"
+    recorder = gs.RecordingTransport(fixture, fake.transport())
+    async with gs.ScraperSession(transport=recorder) as session:
+        recorded = await gs.process_repository("bench", "small", session=session)
+    assert recorded["status"] == "success"
+    assert recorded["downloaded_files"] == 5
+    assert recorded["analyzed_functions"] == 5  # private helpers are not indexed
+
+    # Replay into a fresh database and store without any fake server
+    for name in ("scraped.db", "scraped.db-wal", "scraped.db-shm"):
+        (scraper_env / name).unlink(missing_ok=True)
+    shutil.rmtree(scraper_env / "blobs")
+    gs.init_db()
+    replay = gs.ReplayTransport(fixture)
+    async with gs.ScraperSession(transport=replay) as session:
+        replayed = await gs.process_repository("bench", "small", session=session)
+    assert replay.misses == 0
+    assert {k: replayed[k] for k in ("status", "downloaded_files", "analyzed_functions")} == \
+        {k: recorded[k] for k in ("status", "downloaded_files", "analyzed_functions")}
+
+def test_parse_only_import_has_no_side_effects(tmp_path):
+    code = (
+        "import sys\n"
+        "from scraper.github_scraper import analyze_python_file, PathFilter\n"
+        "print(sorted(m for m in ('httpx', 'psutil', 'sqlite3', 'dotenv') if m in sys.modules))\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k not in ("GITHUB_TOKEN", "GITHUB_TOKENS")}
+    env["PYTHONPATH"] = str(Path(__file__).resolve().parent.parent)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
+    assert not (tmp_path / "scraper.log").exists()
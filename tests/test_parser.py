@@ -1,5 +1,10 @@
+import shutil
+import sys
 import pytest
-from parser.parser import parse_python_file
+from parser.parser import (
+    JS_PARSER, PARSERS, ParseCache, ParserWorker, ParserWorkerError,
+    _go_parser_commands, parse_directory, parse_python_file
+)
 
 def test_function_extraction(tmp_path):
     """Test if the parser extracts functions correctly using a temporary file."""
@@ -19,4 +24,184 @@ def add(a: int, b: int) -> int:
     assert len(parsed_data["functions"]) == 1
     assert parsed_data["functions"][0]["name"] == "add"
     assert parsed_data["functions"][0]["parameters"] == ["a", "b"]
-    assert parsed_data["functions"][0]["return_type"] == "int"
\ No newline at end of file
+    assert parsed_data["functions"][0]["return_type"] == "int"
+
+def test_parse_directory_parallel_matches_serial(tmp_path):
+    """Parallel parsing merges results in the same order as a serial run."""
+    for i in range(20):
+        package = tmp_path / f"pkg{i % 3}"
+        package.mkdir(exist_ok=True)
+        (package / f"mod{i}.py").write_text(f"def func{i}(x: int) -> int:\n    return x\n")
+
+    serial = parse_directory(tmp_path, workers=1, cache=False)
+    parallel = parse_directory(tmp_path, workers=3, chunk_size=2, cache=False)
+
+    assert len(serial) == 20
+    assert list(parallel.items()) == list(serial.items())
+
+
+def test_parse_cache_hit_then_miss_after_change(tmp_path, monkeypatch):
+    """Unchanged files come from the cache; a changed file is parsed again."""
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.py").write_text("def a(x: int) -> int:\n    return x\n")
+    (source / "b.py").write_text("def b(y: str) -> str:\n    return y\n")
+    cache = ParseCache(tmp_path / "cache.db")
+    parsed = []
+    monkeypatch.setitem(PARSERS, ".py", lambda path: parsed.append(path.name) or parse_python_file(path))
+
+    first = parse_directory(source, workers=1, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert sorted(parsed) == ["a.py", "b.py"]
+
+    parsed.clear()
+    assert parse_directory(source, workers=1, cache=cache) == first
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert parsed == []
+
+    (source / "b.py").write_text("def b(y: str) -> str:\n    return y\n\ndef c():\n    pass\n")
+    second = parse_directory(source, workers=1, cache=cache)
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert parsed == ["b.py"]
+    assert second["a.py"] == first["a.py"]
+    assert [f["name"] for f in second["b.py"]["functions"]] == ["b", "c"]
+
+
+FAKE_WORKER = (
+    "import json, sys, time\n"
+    "for line in sys.stdin:\n"
+    "    request = json.loads(line)\n"
+    "    if request['path'] == 'crash':\n"
+    "        sys.exit(1)\n"
+    "    if request['path'] == 'hang':\n"
+    "        time.sleep(60)\n"
+    "    if request['path'] == 'noise':\n"
+    "        print('debug output', flush=True)\n"
+    "    print(json.dumps({'id': request['id'], 'result': {'path': request['path']}}), flush=True)\n"
+)
+
+
+def test_parser_worker_restarts_after_crash_and_timeout():
+    """A crashed, hung or garbled worker fails only its own file and is restarted."""
+    worker = ParserWorker([sys.executable, "-c", FAKE_WORKER], timeout=1)
+    try:
+        assert worker.parse("a.js") == {"path": "a.js"}
+        for bad in ("crash", "hang", "noise"):
+            with pytest.raises(ParserWorkerError):
+                worker.parse(bad)
+            assert worker.parse("b.js") == {"path": "b.js"}
+        assert worker.restarts == 3
+    finally:
+        worker.stop()
+
+
+def test_parser_worker_falls_back_when_command_cannot_start():
+    worker = ParserWorker(["/nonexistent/parse_go"], fallbacks=[[sys.executable, "-c", FAKE_WORKER]])
+    try:
+        assert worker.parse("a.go") == {"path": "a.go"}
+        assert worker.command[0] == sys.executable
+    finally:
+        worker.stop()
+
+    with pytest.raises(ParserWorkerError):
+        ParserWorker(["/nonexistent/parse_go"]).parse("a.go")
+
+
+JS_SOURCE = """
+/**
+ * Adds two numbers.
+ * @param {number} a
+ * @param {number} b
+ * @returns {number}
+ */
+export function add(a, b = 1) { return a + b; }
+function _hidden() {}
+const square = (n) => n * n;
+const pattern = /[}{]/g;  // braces in a regex are not code
+
+/** A user. */
+class User {
+  constructor(name) { this.name = name; }
+  greet(other) { return `hi ${other}`; }
+  static create() { return new User("x"); }
+  _secret() {}
+}
+"""
+
+GO_SOURCE = """package demo
+
+// Server handles requests.
+type Server struct{ addr string }
+
+// Start begins serving.
+func (s *Server) Start(port int) error { return nil }
+
+func (s *Server) stop() {}
+
+// Runner runs things.
+type Runner interface {
+	Run() error
+	stop()
+}
+
+// Add adds two numbers.
+func Add(a, b int) int { return a + b }
+
+func hidden() {}
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_js_worker_extracts_functions_classes_and_jsdoc(tmp_path):
+    source = tmp_path / "user.js"
+    source.write_text(JS_SOURCE)
+    worker = ParserWorker(["node", str(JS_PARSER)])
+    try:
+        result = worker.parse(source)
+        assert result["language"] == "javascript"
+        add, square = result["functions"]
+        assert add["name"] == "add"
+        assert add["docstring"] == "Adds two numbers."
+        assert add["parameters"] == [{"name": "a", "type": "number"}, {"name": "b", "type": "number"}]
+        assert add["return_type"] == "number"
+        assert square["name"] == "square"
+        assert result["classes"] == [{"name": "User", "docstring": "A user.", "methods": ["greet", "create"]}]
+
+        with pytest.raises(ParserWorkerError, match="ENOENT"):
+            worker.parse(tmp_path / "missing.js")
+
+        # A killed worker is restarted for the next file
+        worker.process.kill()
+        worker.process.wait()
+        assert worker.parse(source)["functions"][0]["name"] == "add"
+    finally:
+        worker.stop()
+
+
+@pytest.mark.skipif(shutil.which("go") is None, reason="go is not installed")
+def test_go_worker_extracts_functions_and_methods(tmp_path):
+    source = tmp_path / "server.go"
+    source.write_text(GO_SOURCE)
+    broken = tmp_path / "broken.go"
+    broken.write_text("package demo\n\nfunc (\n")
+    command, fallbacks = _go_parser_commands()
+    worker = ParserWorker(command, fallbacks=fallbacks, timeout=120)  # go run may compile first
+    try:
+        result = worker.parse(source)
+        assert result["language"] == "go"
+        assert result["functions"] == [{
+            "name": "Add", "docstring": "Add adds two numbers.",
+            "parameters": [{"name": "a", "type": "int"}, {"name": "b", "type": "int"}],
+            "return_type": "int"
+        }]
+        assert result["classes"] == [
+            {"name": "Server", "docstring": "Server handles requests.", "methods": ["Start"]},
+            {"name": "Runner", "docstring": "Runner runs things.", "methods": ["Run"]},
+        ]
+
+        with pytest.raises(ParserWorkerError, match="expected"):
+            worker.parse(broken)
+        assert worker.restarts == 0  # an error response does not restart the worker
+        assert worker.parse(source)["functions"][0]["name"] == "Add"
+    finally:
+        worker.stop()